@@ -1,7 +1,8 @@
-from flask import Flask, render_template, jsonify, request, send_file
+from flask import Flask, render_template, jsonify, request, send_file, Response, stream_with_context
 from youtube_api import YouTubeChannel
 from transcriber import TranscriptExtractor
 from translator import TranslationService
+from llm_clients import clients
 import voice_generator
 import video_generator
 import youtube_uploader
@@ -10,6 +11,7 @@ import config
 from flask_cors import CORS
 import threading
 import uuid
+import json
 import os
 
 app = Flask(__name__)
@@ -98,11 +100,51 @@ def search_videos():
 def extract_transcript():
     data = request.json
     video_ids = data.get('video_ids', [])
+    use_cache = not data.get('refresh', False)
+    workers = int(data['workers']) if data.get('workers') else None
+    segments = data.get('format') == 'segments'  # 'text' (default) or 'segments'
     if not video_ids:
         return jsonify({'error': 'No video IDs provided'}), 400
     
-    results = transcriber.extract_batch(video_ids)
-    return jsonify({'results': results})
+    results = transcriber.extract_batch(video_ids, use_cache=use_cache, workers=workers,
+                                        segments=segments)
+    return jsonify({'results': results, 'cache': transcriber.cache_stats()})
+
+
+@app.route('/api/transcript/stream', methods=['POST'])
+def stream_transcripts():
+    """Extract transcripts, emitting each result as NDJSON as soon as it is ready."""
+    data = request.json
+    video_ids = data.get('video_ids', [])
+    use_cache = not data.get('refresh', False)
+    workers = int(data['workers']) if data.get('workers') else None
+    segments = data.get('format') == 'segments'  # 'text' (default) or 'segments'
+    if not video_ids:
+        return jsonify({'error': 'No video IDs provided'}), 400
+    
+    def generate():
+        for index, result in transcriber.extract_iter(video_ids, use_cache=use_cache, workers=workers,
+                                                      segments=segments):
+            yield json.dumps({'index': index, 'result': result}) + '\n'
+        yield json.dumps({'done': True, 'cache': transcriber.cache_stats()}) + '\n'
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/transcript/cache', methods=['GET'])
+def transcript_cache_stats():
+    """Get transcript cache hit/miss counters."""
+    return jsonify(transcriber.cache_stats())
+
+
+@app.route('/api/transcript/backends', methods=['GET'])
+def transcript_backend_stats():
+    """Get live transcript backend stats (success rate, latency, circuit state, order)."""
+    return jsonify(transcriber.get_backend_stats())
 
 
 @app.route('/api/languages', methods=['GET'])
@@ -143,107 +185,139 @@ def switch_model():
         }), 400
 
 
+@app.route('/api/models/health', methods=['GET'])
+def model_health():
+    """Get per-model latency, success rate and circuit state used for hedging/failover."""
+    return jsonify(translator.model_health())
+
+
+@app.route('/api/models/limits', methods=['GET'])
+def model_rate_limits():
+    """Get per-model RPM/TPM queue depth and wait times."""
+    return jsonify(translator.rate_limit_status())
+
+
 @app.route('/api/translate', methods=['POST'])
 def translate_text():
     data = request.json
     text = data.get('text', '')
     target_lang = data.get('target_lang', 'es')
+    compact = data.get('compact', True)
+    use_cache = not data.get('refresh', False)
+    chunked = data.get('chunked', True)
+    hedge = data.get('hedge', True)
+    model = data.get('model')  # Optional per-request model; defaults to the selected one
     
     if not text:
         return jsonify({'error': 'No text provided'}), 400
+    if model and model not in config.AVAILABLE_MODELS:
+        return jsonify({'error': f'Unknown model: {model}'}), 400
+    
+    # Server-Sent Events: 'data' events carry {"delta": ...}, then a final 'done' or 'error' event
+    if data.get('stream'):
+        def generate():
+            for event, payload in translator.translate_stream(text, target_lang, compact=compact,
+                                                              use_cache=use_cache, chunked=chunked,
+                                                              hedge=hedge, model=model):
+                if event == 'delta':
+                    yield f"data: {json.dumps({'delta': payload})}\n\n"
+                else:
+                    yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
     
-    result = translator.translate(text, target_lang)
+    result = translator.translate(text, target_lang, compact=compact, use_cache=use_cache,
+                                  chunked=chunked, hedge=hedge, model=model)
     return jsonify(result)
 
 
+@app.route('/api/translate/multi', methods=['POST'])
+def translate_multi():
+    """Translate one text into several target languages concurrently."""
+    data = request.json
+    text = data.get('text', '')
+    target_langs = data.get('target_langs', [])
+    use_cache = not data.get('refresh', False)
+    model = data.get('model')  # Only used for an 'en' target
+    
+    if not text:
+        return jsonify({'error': 'No text provided'}), 400
+    if not target_langs:
+        return jsonify({'error': 'No target languages provided'}), 400
+    if model and model not in config.AVAILABLE_MODELS:
+        return jsonify({'error': f'Unknown model: {model}'}), 400
+    
+    # NDJSON: one {"lang", "result"} line per language as it finishes, then {"done": true}
+    if data.get('stream'):
+        def generate():
+            for lang, result in translator.translate_iter(text, target_langs, use_cache=use_cache,
+                                                          model=model):
+                yield json.dumps({'lang': lang, 'result': result}) + '\n'
+            yield json.dumps({'done': True}) + '\n'
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    
+    results = translator.translate_many(text, target_langs, use_cache=use_cache, model=model)
+    return jsonify({'results': results})
+
+
+@app.route('/api/translate/cache', methods=['GET'])
+def translation_cache_stats():
+    """Get translation cache hit/miss counters."""
+    return jsonify(translator.cache_stats())
+
+
+@app.route('/api/clients/stats', methods=['GET'])
+def llm_client_stats():
+    """Get shared AI client setup cost and connection reuse counters."""
+    return jsonify(clients.stats())
+
+
 @app.route('/api/generate-production', methods=['POST'])
 def generate_production():
     """Generate production-ready output: Spanish title, description, and tags in ONE API call."""
     data = request.json
     title = data.get('title', '')
     english_text = data.get('english_text', '')
+    model = data.get('model')  # Per-request model; defaults to the selected one
     
     if not english_text:
         return jsonify({'error': 'No English text provided'}), 400
+    if model and model not in config.AVAILABLE_MODELS:
+        return jsonify({'success': False, 'error': f'Unknown model: {model}'}), 400
     
-    try:
-        import json
-        
-        # Get current model and its provider
-        current_model = TranslationService.get_current_model()
-        model_info = config.AVAILABLE_MODELS.get(current_model, {})
-        provider = model_info.get('provider', 'google')
-        
-        # Single combined prompt for all outputs
-        combined_prompt = f"""Generate YouTube production content in Spanish for this football video.
-
-ORIGINAL TITLE: {title}
-
-ENGLISH CONTENT: {english_text[:1000]}
-
-Return EXACTLY this JSON format (no markdown, no code blocks, just raw JSON):
-{{
-    "title": "🚨 SPANISH TITLE IN ALL CAPS HERE",
-    "description": "Long SEO description here with emojis and hashtags at end",
-    "tags": "tag1, tag2, tag3, tag4, tag5"
-}}
-
-RULES FOR EACH FIELD:
-- TITLE: TRANSLATE the original title to Spanish. Keep the SAME structure and format (including any | separators). The original title may be in Malayalam, English, or any language — translate it accurately to Spanish. Add 🚨 at start and make ALL UPPERCASE. Keep English words like "Football", "Champions League", team names, player names as they are.
-- DESCRIPTION: 5-8 sentences, SEO-optimized, include emojis, hashtags at end (lowercase like #futbol #barcelona), NO bold/markdown formatting
-- TAGS: 10-15 tags separated by commas, all lowercase, include player names, team names, relevant topics
+    result = translator.generate_production(title, english_text, model=model)
+    return jsonify(result)
 
-Return ONLY the JSON, nothing else."""
 
-        # Call appropriate API based on provider
-        if provider == 'groq':
-            # Use Groq API
-            if not config.GROQ_API_KEY:
-                return jsonify({'success': False, 'error': 'Groq API key not configured'})
-            
-            from groq import Groq
-            groq_client = Groq(api_key=config.GROQ_API_KEY)
-            
-            completion = groq_client.chat.completions.create(
-                model=current_model,
-                messages=[{"role": "user", "content": combined_prompt}],
-                temperature=0.7,
-                max_completion_tokens=2048,
-                stream=False
-            )
-            response_text = completion.choices[0].message.content.strip()
-        else:
-            # Use Gemini/Gemma API
-            from google import genai
-            client = genai.Client(api_key=config.GEMINI_API_KEY)
-            
-            response = client.models.generate_content(
-                model=current_model,
-                contents=combined_prompt
-            )
-            response_text = response.text.strip()
-        
-        # Remove any markdown code blocks if present
-        if response_text.startswith('```'):
-            response_text = response_text.split('```')[1]
-            if response_text.startswith('json'):
-                response_text = response_text[4:]
-        response_text = response_text.strip()
-        
-        result = json.loads(response_text)
-        
-        return jsonify({
-            'success': True,
-            'title': result.get('title', ''),
-            'description': result.get('description', ''),
-            'tags': result.get('tags', ''),
-            'model_used': current_model
-        })
-        
-    except json.JSONDecodeError as e:
-        return jsonify({'success': False, 'error': f'Failed to parse AI response: {str(e)}'})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+@app.route('/api/translate/production', methods=['POST'])
+def translate_with_production():
+    """Translate to English AND generate the Spanish production output in one structured AI call."""
+    data = request.json
+    text = data.get('text', '')
+    title = data.get('title', '')
+    compact = data.get('compact', True)
+    use_cache = not data.get('refresh', False)
+    chunked = data.get('chunked', True)
+    hedge = data.get('hedge', True)
+    model = data.get('model')
+    
+    if not text:
+        return jsonify({'error': 'No text provided'}), 400
+    if model and model not in config.AVAILABLE_MODELS:
+        return jsonify({'error': f'Unknown model: {model}'}), 400
+    
+    result = translator.translate_with_production(text, title, compact=compact, use_cache=use_cache,
+                                                  chunked=chunked, hedge=hedge, model=model)
+    return jsonify(result)
 
 
 # ===== THUMBNAIL ENDPOINTS =====
@@ -287,10 +361,9 @@ def detect_text_regions():
         if ',' in image_data:
             image_data = image_data.split(',')[1]
         
-        from google import genai
         from google.genai import types
         
-        client = genai.Client(api_key=config.GEMINI_API_KEY)
+        client = clients.get('google')
         
         prompt = """Analyze this YouTube thumbnail image and identify the text region(s).
 Return ONLY a JSON array with the bounding box coordinates for each text region.
@@ -458,16 +531,66 @@ def auto_analyze_thumbnail():
 
 @app.route('/api/voices', methods=['GET'])
 def get_voices():
-    """Get all available edge-tts voices, organized by language."""
+    """
+    Get edge-tts voices, organized by language.
+    Optional filters: language (name or code), locale, gender, tier,
+    recommended (true/false), q (search), page, per_page.
+    Without filters the full catalog is returned.
+    """
+    try:
+        args = request.args
+        filters = ('language', 'locale', 'gender', 'tier', 'recommended', 'q', 'page', 'per_page')
+        if not any(args.get(name) for name in filters):
+            voices = voice_generator.get_voices_sync()
+            total_voices, total_languages = voice_generator.get_voice_count(voices)
+            return jsonify({
+                'success': True,
+                'voices': voices,
+                'total_voices': total_voices,
+                'total_languages': total_languages,
+                'recommended': voice_generator.RECOMMENDED_VOICES
+            })
+        
+        page = args.get('page', 1, type=int)
+        per_page = args.get('per_page', type=int)
+        if page < 1 or (per_page is not None and per_page < 1):
+            return jsonify({'success': False, 'error': 'page and per_page must be positive integers'}), 400
+        
+        recommended = args.get('recommended')
+        result = voice_generator.query_voices(
+            language=args.get('language'),
+            locale=args.get('locale'),
+            gender=args.get('gender'),
+            tier=args.get('tier'),
+            recommended=recommended.lower() in ('1', 'true', 'yes') if recommended else None,
+            search=args.get('q'),
+            page=page,
+            per_page=per_page
+        )
+        return jsonify({
+            'success': True,
+            'voices': result['voices'],
+            'total_voices': result['total'],
+            'total_languages': len(result['voices']),
+            'page': result['page'],
+            'per_page': result['per_page'],
+            'pages': result['pages'],
+            'recommended': result['recommended']
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/voices/languages', methods=['GET'])
+def get_voice_languages():
+    """Get the languages that have voices, with counts (small payload for the picker)."""
     try:
-        voices = voice_generator.get_voices_sync()
-        total_voices, total_languages = voice_generator.get_voice_count()
+        languages = voice_generator.get_voice_languages()
         return jsonify({
             'success': True,
-            'voices': voices,
-            'total_voices': total_voices,
-            'total_languages': total_languages,
-            'recommended': voice_generator.RECOMMENDED_VOICES
+            'languages': languages,
+            'total_voices': sum(lang['count'] for lang in languages),
+            'total_languages': len(languages)
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -510,11 +633,8 @@ def generate_voiceover():
     
     task_id = str(uuid.uuid4())
     
-    def run_generation():
-        voice_generator.generate_voiceover(text, voice, rate, pitch, output_name, task_id)
-    
-    thread = threading.Thread(target=run_generation, daemon=True)
-    thread.start()
+    # Runs on the shared TTS event loop; progress is reported under task_id
+    voice_generator.start_voiceover(text, voice, rate, pitch, output_name, task_id)
     
     return jsonify({
         'success': True,
@@ -523,6 +643,42 @@ def generate_voiceover():
     })
 
 
+@app.route('/api/voiceover/live', methods=['POST'])
+def start_live_voiceover():
+    """Start voiceover generation whose audio can be played while it is being synthesized."""
+    data = request.json
+    text = data.get('text', '')
+    voice = data.get('voice', voice_generator.DEFAULT_VOICE)
+    rate = data.get('rate', voice_generator.DEFAULT_RATE)
+    pitch = data.get('pitch', voice_generator.DEFAULT_PITCH)
+    output_name = data.get('output_name', None)
+    
+    if not text:
+        return jsonify({'success': False, 'error': 'No text provided'}), 400
+    
+    stream_id = voice_generator.start_live_voiceover(text, voice, rate, pitch, output_name)
+    return jsonify({
+        'success': True,
+        'task_id': stream_id,
+        'stream_url': f'/api/voiceover/live/{stream_id}',
+        'message': 'Voiceover generation started'
+    })
+
+
+@app.route('/api/voiceover/live/<stream_id>', methods=['GET'])
+def stream_live_voiceover(stream_id):
+    """Stream voiceover audio (chunked audio/mpeg) as edge-tts produces it."""
+    live = voice_generator.get_live_voiceover(stream_id)
+    if not live:
+        return jsonify({'error': 'Stream not found'}), 404
+    
+    return Response(
+        stream_with_context(live.iter_audio()),
+        mimetype='audio/mpeg',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/voiceover/status/<task_id>', methods=['GET'])
 def voiceover_status(task_id):
     """Get voiceover generation progress."""
@@ -530,6 +686,12 @@ def voiceover_status(task_id):
     return jsonify(progress)
 
 
+@app.route('/api/voiceover/cache', methods=['GET'])
+def voiceover_cache_stats():
+    """Get TTS chunk cache size and hit/miss counters."""
+    return jsonify(voice_generator.get_tts_cache_stats())
+
+
 @app.route('/api/voiceover/download/<filename>', methods=['GET'])
 def download_voiceover(filename):
     """Download generated voiceover MP3."""
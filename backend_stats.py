@@ -0,0 +1,124 @@
+"""
+Backend Stats Module
+Sliding-window health tracking for interchangeable backends (transcript
+methods, AI models, ...).
+
+- Success rate and latency (avg / p90) over the last N calls
+- Circuit breaker that skips a failing backend for a cooldown period
+- Adaptive ordering by expected time-to-success
+"""
+
+import threading
+import time
+from collections import deque
+
+
+# ===== CONFIGURATION =====
+WINDOW_SIZE = 50           # Calls remembered per backend
+FAILURE_THRESHOLD = 3      # Consecutive failures that open the circuit
+COOLDOWN = 120             # Seconds an open circuit stays open
+PRIOR_WEIGHT = 2           # Pseudo-calls blended in from the prior latency
+
+
+class BackendStats:
+    """
+    Tracks recent calls per backend and ranks them.
+
+    `priors` maps backend name → expected latency in seconds before any calls
+    are recorded; its order is also the tie-breaking default order.
+    """
+
+    def __init__(self, priors, window=WINDOW_SIZE, failure_threshold=FAILURE_THRESHOLD,
+                 cooldown=COOLDOWN):
+        self.priors = dict(priors)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._calls = {name: deque(maxlen=window) for name in self.priors}
+        self._consecutive_failures = {name: 0 for name in self.priors}
+        self._open_until = {name: 0.0 for name in self.priors}
+        self._lock = threading.Lock()
+
+    def record(self, name, ok, latency):
+        """Record one call outcome and update the circuit breaker."""
+        now = time.time()
+        with self._lock:
+            self._calls[name].append((ok, latency))
+            if ok:
+                self._consecutive_failures[name] = 0
+                self._open_until[name] = 0.0
+            else:
+                self._consecutive_failures[name] += 1
+                # Also re-opens immediately when a half-open trial call fails
+                if self._consecutive_failures[name] >= self.failure_threshold:
+                    self._open_until[name] = now + self.cooldown
+
+    def _score(self, name):
+        """Expected seconds per success: smoothed mean latency / smoothed success rate (lock held)."""
+        calls = self._calls[name]
+        prior = self.priors[name]
+        successes = sum(1 for ok, _ in calls if ok)
+        total_latency = sum(latency for _, latency in calls)
+
+        mean_latency = (total_latency + prior * PRIOR_WEIGHT) / (len(calls) + PRIOR_WEIGHT)
+        success_rate = (successes + PRIOR_WEIGHT) / (len(calls) + PRIOR_WEIGHT)
+        return mean_latency / success_rate
+
+    def ranked(self):
+        """
+        Return (order, skipped): backends with closed circuits sorted by score,
+        and the ones currently skipped because their circuit is open.
+        If every circuit is open, all backends are returned so callers still get an answer.
+        """
+        now = time.time()
+        with self._lock:
+            scores = {name: self._score(name) for name in self.priors}
+            available = [n for n in self.priors if self._open_until[n] <= now]
+            skipped = [n for n in self.priors if self._open_until[n] > now]
+
+        if not available:
+            available, skipped = list(self.priors), []
+        return sorted(available, key=lambda n: scores[n]), skipped
+
+    def percentile(self, name, pct=90):
+        """Latency percentile over successful calls in the window (None if no data)."""
+        with self._lock:
+            latencies = sorted(latency for ok, latency in self._calls[name] if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(pct / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def snapshot(self):
+        """Return live stats for every backend plus the current order."""
+        now = time.time()
+        order, skipped = self.ranked()
+        backends = {}
+
+        for name in self.priors:
+            p90 = self.percentile(name, 90)
+            with self._lock:
+                calls = list(self._calls[name])
+                consecutive = self._consecutive_failures[name]
+                open_until = self._open_until[name]
+                score = self._score(name)
+
+            successes = sum(1 for ok, _ in calls if ok)
+            if open_until > now:
+                state = 'open'
+            elif consecutive >= self.failure_threshold:
+                state = 'half-open'
+            else:
+                state = 'closed'
+
+            backends[name] = {
+                'calls': len(calls),
+                'success_rate': round(successes / len(calls), 3) if calls else None,
+                'avg_latency': round(sum(l for _, l in calls) / len(calls), 3) if calls else None,
+                'p90_latency': round(p90, 3) if p90 is not None else None,
+                'consecutive_failures': consecutive,
+                'state': state,
+                'open_for': round(max(0.0, open_until - now), 1),
+                'score': round(score, 3)
+            }
+
+        return {'order': order, 'skipped': skipped, 'backends': backends}
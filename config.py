@@ -6,6 +6,7 @@ load_dotenv()
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", YOUTUBE_API_KEY)  # Use Gemini key if set, else YouTube key
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")  # Groq API key for GPT models
+YTDLP_COOKIES_FILE = os.getenv("YTDLP_COOKIES_FILE")  # Optional Netscape cookies.txt for yt-dlp
 RAF_TALKS_HANDLE = "@RafTalks"
 RAF_TALKS_CHANNEL_ID = ""  # Will be populated at runtime
 
@@ -14,45 +15,72 @@ DEV_MODE = True
 DEV_VIDEO_LIMIT = 100
 
 # Available AI models - organized by provider
+# chunk_tokens: input budget per translation chunk, sized so each chunk's
+# output stays well inside the model's completion limit
+# rpm / tpm: provider requests- and tokens-per-minute quotas (free tier)
+# json_mode: supports schema-constrained JSON output (structured output)
 AVAILABLE_MODELS = {
     # Gemini - primary models (Google)
     "gemini-3-flash": {
         "name": "Gemini 3 Flash",
         "description": "Latest Gemini 3, most powerful",
         "category": "gemini",
-        "provider": "google"
+        "provider": "google",
+        "chunk_tokens": 6000,
+        "rpm": 10,
+        "tpm": 250000,
+        "json_mode": True
     },
     "gemini-2.5-flash-lite": {
         "name": "Gemini 2.5 Flash Lite",
         "description": "Fast, best quality (default)",
         "category": "gemini",
-        "provider": "google"
+        "provider": "google",
+        "chunk_tokens": 6000,
+        "rpm": 15,
+        "tpm": 250000,
+        "json_mode": True
     },
     # Gemma - backup options (Google, instruction-tuned)
     "gemma-3-27b-it": {
         "name": "Gemma 3 27B",
         "description": "Powerful open-source backup",
         "category": "gemma",
-        "provider": "google"
+        "provider": "google",
+        "chunk_tokens": 3000,
+        "rpm": 30,
+        "tpm": 15000,
+        "json_mode": False
     },
     "gemma-3-4b-it": {
         "name": "Gemma 3 4B",
         "description": "Fast open-source backup",
         "category": "gemma",
-        "provider": "google"
+        "provider": "google",
+        "chunk_tokens": 2000,
+        "rpm": 30,
+        "tpm": 15000,
+        "json_mode": False
     },
     # Groq - GPT model (via Groq API)
     "openai/gpt-oss-120b": {
         "name": "GPT-OSS 120B (Groq)",
         "description": "ChatGPT-style via Groq",
         "category": "groq",
-        "provider": "groq"
+        "provider": "groq",
+        "chunk_tokens": 1500,
+        "rpm": 30,
+        "tpm": 8000,
+        "json_mode": True
     }
 }
 
 # Default model
 DEFAULT_MODEL = "gemini-2.5-flash-lite"
 
+# Models translations may fail over / hedge to when the selected model is slow or erroring
+FALLBACK_MODELS = ["gemini-2.5-flash-lite", "gemma-3-27b-it", "openai/gpt-oss-120b"]
+
 # ===== PHASE 6 & 7: HeyGen + Social Media =====
 
 # HeyGen video import directory
@@ -0,0 +1,142 @@
+"""
+Disk Cache Module
+Small SQLite-backed key/value store shared by the pipeline stages.
+
+- JSON values with per-entry TTL
+- Size-bounded LRU eviction (by entry count)
+- Hit/miss counters for the stats endpoints
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+# ===== CONFIGURATION =====
+CACHE_DIR = os.path.join(os.path.dirname(__file__), 'output', 'cache')
+
+# Ensure cache directory exists
+os.makedirs(CACHE_DIR, exist_ok=True)
+
+
+class DiskCache:
+    """
+    Persistent JSON cache stored in output/cache/<name>.sqlite3.
+    Safe to share between Flask request threads.
+    """
+
+    def __init__(self, name, ttl=7 * 24 * 3600, max_entries=2000):
+        self.name = name
+        self.path = os.path.join(CACHE_DIR, f"{name}.sqlite3")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+            'created_at REAL NOT NULL, accessed_at REAL NOT NULL, expires_at REAL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_accessed ON entries(accessed_at)')
+        self._conn.commit()
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing/expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                self._conn.commit()
+                self.misses += 1
+                return default
+
+            # Touch for LRU ordering
+            self._conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(value)
+
+    def has(self, key):
+        """True if key is cached and not expired (does not touch counters or LRU order)."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT expires_at FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+        return row is not None and (row[0] is None or row[0] >= time.time())
+
+    def set(self, key, value, ttl=None):
+        """Store a JSON-serializable value, evicting least-recently-used entries if full."""
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl else None
+        payload = json.dumps(value, ensure_ascii=False)
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (key, value, created_at, accessed_at, expires_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, payload, now, now, expires_at)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def delete(self, key):
+        """Remove a single entry."""
+        with self._lock:
+            self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every entry and reset counters."""
+        with self._lock:
+            self._conn.execute('DELETE FROM entries')
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def _evict(self):
+        """Drop expired entries, then the oldest-accessed ones above max_entries (lock held)."""
+        self._conn.execute(
+            'DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at < ?', (time.time(),)
+        )
+        if not self.max_entries:
+            return
+
+        count = self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                'DELETE FROM entries WHERE key IN '
+                '(SELECT key FROM entries ORDER BY accessed_at ASC LIMIT ?)',
+                (overflow,)
+            )
+
+    def stats(self):
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'name': self.name,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0
+        }
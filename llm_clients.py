@@ -0,0 +1,128 @@
+"""
+LLM Clients Module
+Process-wide registry of AI provider clients (Gemini/Gemma via google-genai, Groq).
+
+- One client per provider, created lazily and shared by every request thread
+- Keep-alive HTTP connection pools so calls reuse TLS connections
+- Setup-time instrumentation: how long clients took to build and how much reuse saved
+"""
+
+import threading
+import time
+import config
+
+
+# ===== CONFIGURATION =====
+POOL_MAX_CONNECTIONS = 20      # Concurrent connections per provider
+POOL_MAX_KEEPALIVE = 10        # Idle connections kept open for reuse
+KEEPALIVE_EXPIRY = 60          # Seconds an idle connection stays open
+
+PROVIDERS = ('google', 'groq')
+
+
+def _pool_limits():
+    """httpx connection-pool limits shared by both providers (None if httpx is unavailable)."""
+    try:
+        import httpx
+    except ImportError:
+        return None
+    return httpx.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+
+
+def _create_google():
+    """google-genai client with a keep-alive pool (falls back to defaults on older SDKs)."""
+    from google import genai
+
+    limits = _pool_limits()
+    if limits is not None:
+        try:
+            from google.genai import types
+            return genai.Client(
+                api_key=config.GEMINI_API_KEY,
+                http_options=types.HttpOptions(client_args={'limits': limits})
+            )
+        except Exception:
+            # SDK versions before client_args still pool connections inside one client
+            pass
+    return genai.Client(api_key=config.GEMINI_API_KEY)
+
+
+def _create_groq():
+    """Groq client on a pooled httpx client, or None if Groq is not configured."""
+    if not config.GROQ_API_KEY:
+        return None
+    try:
+        from groq import Groq
+    except ImportError:
+        print("Warning: Groq package not installed. Run: pip install groq")
+        return None
+
+    limits = _pool_limits()
+    if limits is not None:
+        import httpx
+        return Groq(api_key=config.GROQ_API_KEY, http_client=httpx.Client(limits=limits))
+    return Groq(api_key=config.GROQ_API_KEY)
+
+
+class ClientRegistry:
+    """
+    Lazily builds one client per provider and hands the same instance to
+    every caller. Thread-safe.
+    """
+
+    FACTORIES = {
+        'google': _create_google,
+        'groq': _create_groq
+    }
+
+    def __init__(self):
+        self._clients = {}
+        self._stats = {
+            name: {'created': 0, 'setup_seconds': 0.0, 'requests': 0, 'reuses': 0}
+            for name in PROVIDERS
+        }
+        self._lock = threading.Lock()
+
+    def get(self, provider):
+        """Return the shared client for provider ('google' or 'groq'); None if unavailable."""
+        with self._lock:
+            stats = self._stats[provider]
+            stats['requests'] += 1
+
+            if provider in self._clients:
+                stats['reuses'] += 1
+                return self._clients[provider]
+
+            start = time.perf_counter()
+            client = self.FACTORIES[provider]()
+            if client is not None:
+                stats['setup_seconds'] += time.perf_counter() - start
+                stats['created'] += 1
+
+            # A missing Groq client is cached too (the key only changes on restart)
+            self._clients[provider] = client
+            return client
+
+    def stats(self):
+        """Return per-provider setup cost and the estimated time saved by reuse."""
+        with self._lock:
+            result = {}
+            for name, stats in self._stats.items():
+                avg_setup = stats['setup_seconds'] / stats['created'] if stats['created'] else None
+                result[name] = {
+                    'active': self._clients.get(name) is not None,
+                    'created': stats['created'],
+                    'requests': stats['requests'],
+                    'reuses': stats['reuses'],
+                    'avg_setup_ms': round(avg_setup * 1000, 1) if avg_setup is not None else None,
+                    'saved_seconds': round(avg_setup * stats['reuses'], 3) if avg_setup is not None else 0.0
+                }
+            return result
+
+
+# Shared by the translator and the Flask endpoints
+clients = ClientRegistry()
@@ -0,0 +1,189 @@
+"""
+Rate Limit Module
+Thread-safe primitives for pacing outbound requests to external services.
+
+- TokenBucket: steady request rate with a small burst allowance
+- BackoffScheduler: shared jittered exponential backoff after 429s
+- AdmissionScheduler: per-model requests/min + tokens/min admission with queue stats
+"""
+
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Classic token bucket: refills `rate` tokens per second up to `capacity`.
+    acquire() blocks the calling thread until enough tokens are available.
+    A request larger than `capacity` waits for a full bucket and is then charged
+    in full, leaving the bucket in debt so the long-run rate still holds.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add tokens earned since the last update (lock held)."""
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available and take them. Returns seconds waited."""
+        needed = min(tokens, self.capacity)
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return waited
+                wait = (needed - self._tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
+
+    def available(self):
+        """Return the number of tokens currently in the bucket (0 while in debt)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, self._tokens)
+
+
+class BackoffScheduler:
+    """
+    Process-wide pause after a throttling (429) response.
+
+    Once report_throttled() is called, wait() blocks every caller until the
+    backoff window has passed. Each further 429 doubles the window (with
+    jitter) up to max_delay; report_success() resets it.
+    """
+
+    def __init__(self, base=2.0, max_delay=120.0, jitter=0.5):
+        self.base = base
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self._consecutive = 0
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block while a backoff window is active. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                remaining = self._resume_at - time.monotonic()
+            if remaining <= 0:
+                return waited
+            # Spread waiters out a little so they don't all resume at once
+            delay = remaining + random.uniform(0, self.jitter)
+            time.sleep(delay)
+            waited += delay
+
+    def report_throttled(self, retry_after=None):
+        """Start (or extend) a backoff window. Returns the delay applied."""
+        with self._lock:
+            self._consecutive += 1
+            delay = min(self.max_delay, self.base * 2 ** (self._consecutive - 1))
+            delay = random.uniform(delay * (1 - self.jitter), delay)
+            if retry_after:
+                delay = max(delay, float(retry_after))
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            return delay
+
+    def report_success(self):
+        """A request went through; reset the exponential backoff."""
+        with self._lock:
+            self._consecutive = 0
+
+    def status(self):
+        """Return whether we are backing off, and for how long."""
+        with self._lock:
+            remaining = max(0.0, self._resume_at - time.monotonic())
+            return {
+                'throttled': remaining > 0,
+                'resume_in': round(remaining, 1),
+                'consecutive_429s': self._consecutive
+            }
+
+
+class AdmissionScheduler:
+    """
+    Per-model admission control for AI APIs with requests-per-minute and
+    tokens-per-minute quotas.
+
+    Each model gets an RPM bucket and a TPM bucket refilling at `headroom` of
+    the published limit, with only `burst` of a minute's quota available at
+    once, so even the worst-case 60 s window stays under the limit. admit()
+    queues the caller until both buckets allow the request.
+    """
+
+    def __init__(self, limits, headroom=0.8, burst=0.2):
+        self._rpm = {}
+        self._tpm = {}
+        for name, limit in limits.items():
+            if limit.get('rpm'):
+                self._rpm[name] = self._bucket(limit['rpm'], headroom, burst)
+            if limit.get('tpm'):
+                self._tpm[name] = self._bucket(limit['tpm'], headroom, burst)
+
+        self._stats = {
+            name: {'waiting': 0, 'admitted': 0, 'tokens': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+            for name in limits
+        }
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bucket(per_minute, headroom, burst):
+        rate = per_minute * headroom / 60
+        return TokenBucket(rate, capacity=max(1.0, per_minute * headroom * burst))
+
+    def admit(self, name, tokens=0):
+        """Block until `name` may send a request of ~`tokens` tokens. Returns seconds waited."""
+        if name not in self._stats:
+            return 0.0
+
+        with self._lock:
+            self._stats[name]['waiting'] += 1
+        try:
+            waited = 0.0
+            if name in self._rpm:
+                waited += self._rpm[name].acquire(1)
+            if name in self._tpm and tokens:
+                waited += self._tpm[name].acquire(tokens)
+        finally:
+            with self._lock:
+                stats = self._stats[name]
+                stats['waiting'] -= 1
+
+        with self._lock:
+            stats['admitted'] += 1
+            stats['tokens'] += tokens
+            stats['total_wait'] += waited
+            stats['max_wait'] = max(stats['max_wait'], waited)
+        return waited
+
+    def status(self):
+        """Return queue depth, wait times and remaining burst capacity per model."""
+        result = {}
+        with self._lock:
+            snapshot = {name: dict(stats) for name, stats in self._stats.items()}
+
+        for name, stats in snapshot.items():
+            admitted = stats['admitted']
+            result[name] = {
+                'queue_depth': stats['waiting'],
+                'admitted': admitted,
+                'tokens': stats['tokens'],
+                'avg_wait': round(stats['total_wait'] / admitted, 3) if admitted else 0.0,
+                'max_wait': round(stats['max_wait'], 3),
+                'requests_available': round(self._rpm[name].available(), 1) if name in self._rpm else None,
+                'tokens_available': int(self._tpm[name].available()) if name in self._tpm else None
+            }
+        return result
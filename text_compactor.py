@@ -0,0 +1,102 @@
+"""
+Text Compactor Module
+Cleans up raw caption text before it is sent to the AI translators.
+
+- Merges rolling-caption overlaps (auto captions repeat the tail of the previous line)
+- Drops duplicate lines and [Music]-style annotations
+- Collapses filler words
+- Estimates the prompt tokens saved
+"""
+
+import re
+
+
+# ===== CONFIGURATION =====
+MIN_OVERLAP_WORDS = 2      # Shortest line-to-line overlap treated as a rolling repeat
+
+# Sound/caption tags auto captions insert, e.g. [Music], (Applause), [ __ ]
+ANNOTATION_TAGS = r'(?:music(?: playing)?|applause|laughter|laughing|inaudible|cheering|cheers|crowd(?: noise)?|' \
+                  r'whistle|noise|silence|foreign|speaking foreign language|__)'
+ANNOTATION_PATTERN = re.compile(rf'\[\s*{ANNOTATION_TAGS}\s*\]|\(\s*{ANNOTATION_TAGS}\s*\)', re.IGNORECASE)
+FILLER_PATTERN = re.compile(r'\b(?:u+h+|u+m+|e+r+m+|h+m+|a+h+)\b[,.]?', re.IGNORECASE)
+
+
+def estimate_tokens(text):
+    """
+    Rough LLM token estimate: ~4 characters per token for Latin text,
+    ~2 for other scripts (Malayalam, Hindi, ... tokenize much less efficiently).
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    other_chars = len(text) - ascii_chars
+    return max(1, ascii_chars // 4 + other_chars // 2)
+
+
+def _words(line):
+    """Lowercased words without punctuation, for overlap comparison."""
+    return [re.sub(r'[^\w]', '', w.lower()) for w in line.split()]
+
+
+def _clean_line(line):
+    """Strip annotations and fillers from a single caption line."""
+    line = ANNOTATION_PATTERN.sub(' ', line)
+    line = FILLER_PATTERN.sub(' ', line)
+    return re.sub(r'\s+', ' ', line).strip(' ,')
+
+
+def _merge_rolling(lines):
+    """Remove text a caption line repeats from the line before it."""
+    merged = []
+
+    for line in lines:
+        if not merged:
+            merged.append(line)
+            continue
+
+        prev_words = _words(merged[-1])
+        cur_words = _words(line)
+        raw_words = line.split()
+
+        # Exact repeat, or the line is already contained at the end of the previous one
+        # (single words like "no" after "I said no" are real speech, not a repeat)
+        if len(cur_words) >= MIN_OVERLAP_WORDS and cur_words == prev_words[-len(cur_words):]:
+            continue
+
+        # Growing caption: "the ball" → "the ball goes in"
+        if cur_words[:len(prev_words)] == prev_words:
+            merged[-1] = line
+            continue
+
+        # Rolling overlap: keep only the new tail
+        max_overlap = min(len(prev_words), len(cur_words) - 1)
+        for k in range(max_overlap, MIN_OVERLAP_WORDS - 1, -1):
+            if prev_words[-k:] == cur_words[:k]:
+                line = ' '.join(raw_words[k:])
+                break
+
+        merged.append(line)
+
+    return merged
+
+
+def compact_transcript(text):
+    """
+    Compact caption text for LLM prompts.
+    Returns (compacted_text, stats) where stats reports the token savings.
+    """
+    lines = [_clean_line(line) for line in text.split('\n')]
+    lines = [line for line in lines if line]
+    compacted = '\n'.join(_merge_rolling(lines))
+
+    original_tokens = estimate_tokens(text)
+    compacted_tokens = estimate_tokens(compacted)
+    stats = {
+        'original_chars': len(text),
+        'compacted_chars': len(compacted),
+        'original_tokens': original_tokens,
+        'compacted_tokens': compacted_tokens,
+        'tokens_saved': original_tokens - compacted_tokens,
+        'saved_pct': round(100 * (original_tokens - compacted_tokens) / original_tokens, 1) if original_tokens else 0.0
+    }
+    return compacted, stats
@@ -0,0 +1,113 @@
+"""
+Timed Text Module
+Compact storage for timestamped transcript segments.
+
+- Parallel float32 arrays for start/duration plus an offset table into one text buffer
+- Plain text or timed segment views
+- Compact base64 serialization for the disk caches
+"""
+
+import base64
+from array import array
+
+
+def _pack(values):
+    """Array → base64 string."""
+    return base64.b64encode(values.tobytes()).decode('ascii')
+
+
+def _unpack(typecode, data):
+    """Base64 string → array."""
+    values = array(typecode)
+    values.frombytes(base64.b64decode(data))
+    return values
+
+
+class TimedTranscript:
+    """
+    Transcript segments stored column-wise: segment i spans
+    text_buffer[offsets[i]:offsets[i + 1]] and starts at starts[i] seconds.
+    """
+
+    __slots__ = ('starts', 'durations', 'offsets', 'text_buffer')
+
+    def __init__(self, starts=None, durations=None, offsets=None, text_buffer=''):
+        self.starts = starts if starts is not None else array('f')
+        self.durations = durations if durations is not None else array('f')
+        self.offsets = offsets if offsets is not None else array('I', [0])
+        self.text_buffer = text_buffer
+
+    @classmethod
+    def from_segments(cls, segments):
+        """Build from an iterable of (start, duration, text); empty texts are skipped."""
+        starts, durations, offsets = array('f'), array('f'), array('I', [0])
+        texts = []
+        length = 0
+
+        for start, duration, text in segments:
+            text = (text or '').strip()
+            if not text:
+                continue
+            starts.append(start or 0.0)
+            durations.append(duration or 0.0)
+            texts.append(text)
+            length += len(text)
+            offsets.append(length)
+
+        return cls(starts, durations, offsets, ''.join(texts))
+
+    @classmethod
+    def from_json3(cls, data):
+        """Build from YouTube's json3 caption format (yt-dlp and InnerTube)."""
+        segments = []
+        for event in data.get('events', []):
+            segs = event.get('segs', [])
+            if segs:
+                text = ''.join(seg.get('utf8', '') for seg in segs)
+                segments.append((
+                    event.get('tStartMs', 0) / 1000,
+                    event.get('dDurationMs', 0) / 1000,
+                    text
+                ))
+        return cls.from_segments(segments)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def segment_text(self, index):
+        """Text of a single segment."""
+        return self.text_buffer[self.offsets[index]:self.offsets[index + 1]]
+
+    def text(self, separator='\n'):
+        """Plain text, one segment per line by default."""
+        return separator.join(self.segment_text(i) for i in range(len(self)))
+
+    def segments(self):
+        """Timed segments as a list of {start, duration, text} dicts."""
+        return [
+            {
+                'start': round(self.starts[i], 3),
+                'duration': round(self.durations[i], 3),
+                'text': self.segment_text(i)
+            }
+            for i in range(len(self))
+        ]
+
+    def to_dict(self):
+        """Compact JSON-safe form for the disk caches."""
+        return {
+            'starts': _pack(self.starts),
+            'durations': _pack(self.durations),
+            'offsets': _pack(self.offsets),
+            'text': self.text_buffer
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of to_dict()."""
+        return cls(
+            _unpack('f', data['starts']),
+            _unpack('f', data['durations']),
+            _unpack('I', data['offsets']),
+            data['text']
+        )
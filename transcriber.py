@@ -4,31 +4,167 @@ import subprocess
 import json
 import os
 import tempfile
-from youtube_transcript_api import YouTubeTranscriptApi
+import threading
+import time
+import html
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
+from disk_cache import DiskCache
+from rate_limit import TokenBucket, BackoffScheduler
+from backend_stats import BackendStats
+from timed_text import TimedTranscript
+import config
+
+
+# ===== CONFIGURATION =====
+CACHE_TTL = 7 * 24 * 3600      # Transcripts rarely change once published
+CACHE_MAX_ENTRIES = 5000       # LRU eviction above this many videos
+NEGATIVE_CACHE_TTL = 6 * 3600  # Remember "no captions" for a while (captions can be added later)
+BATCH_WORKERS = 4              # Parallel videos in extract_batch
+YOUTUBE_RATE = 2.0             # Sustained youtube.com requests per second (all workers)
+YOUTUBE_BURST = 5              # Short burst allowance before throttling kicks in
+PAGE_CACHE_SIZE = 64           # Parsed watch pages kept in memory (LRU)
+PAGE_CACHE_TTL = 300           # Seconds a watch page is reused (caption track URLs are signed and expire)
+YTDLP_SUB_LANGS = ['ml', 'en', 'hi', 'ta', 'te', 'kn']   # Also the preference order
+YTDLP_BATCH_SIZE = 20          # Videos per batched yt-dlp process
+COOKIE_BROWSERS = ['chrome', 'edge', 'firefox']
+COOKIE_REVALIDATE = 6 * 3600   # Re-probe cookie sources after this many seconds
+
+# Transcript backends with prior latency (seconds) used until real calls are
+# recorded; the order here is the default fallback order.
+BACKEND_PRIORS = {
+    'library': 1.5,
+    'yt-dlp': 4.0,
+    'innertube': 5.0
+}
+
+
+class NoCaptionsError(Exception):
+    """Backend worked, but the video has no usable captions."""
 
 
 class TranscriptExtractor:
     """
-    Extracts YouTube transcripts using youtube-transcript-api (primary)
-    with InnerTube API fallback.
+    Extracts YouTube transcripts using youtube-transcript-api, yt-dlp and the
+    InnerTube API, tried in adaptive order based on recent backend health.
     """
     
     def __init__(self):
         self.api = YouTubeTranscriptApi()
+        self.cache = DiskCache('transcripts', ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+        self.negative_cache = DiskCache('transcripts_missing', ttl=NEGATIVE_CACHE_TTL,
+                                        max_entries=CACHE_MAX_ENTRIES)
+        # Shared by all batch workers so parallelism doesn't trigger 429s
+        self.rate_limiter = TokenBucket(YOUTUBE_RATE, YOUTUBE_BURST)
+        # Once YouTube answers 429, every pending request backs off together
+        self.backoff = BackoffScheduler()
+        self._pages = OrderedDict()
+        self._pages_lock = threading.Lock()
+        self.backend_stats = BackendStats(BACKEND_PRIORS)
+        # yt-dlp cookie source that last worked: ('cookies', path),
+        # ('cookies-from-browser', name) or None for no cookies
+        self._cookie_source = None
+        self._cookie_resolved_at = None
+        self._cookie_failures = {}     # cookie source -> time of its last cookie error
+        self._cookie_lock = threading.Lock()
+        self._backends = {
+            'library': self._extract_with_library,
+            'yt-dlp': self._extract_with_ytdlp,
+            'innertube': self._extract_with_innertube
+        }
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
     
-    def _get_title(self, video_id):
-        """Fetch video title from YouTube page."""
-        try:
-            url = f"https://www.youtube.com/watch?v={video_id}"
-            response = self.session.get(url, timeout=10)
-            match = re.search(r'<title>(.*?)(?:\s*-\s*YouTube)?\s*</title>', response.text)
+    def _throttle(self):
+        """Wait out any active 429 backoff, then take a rate-limit token."""
+        self.backoff.wait()
+        self.rate_limiter.acquire()
+    
+    def _request(self, method, url, **kwargs):
+        """Throttled youtube.com request; a 429 starts the shared backoff and raises."""
+        self._throttle()
+        response = self.session.request(method, url, **kwargs)
+        
+        if response.status_code == 429:
+            retry_after = response.headers.get('Retry-After', '')
+            self.backoff.report_throttled(int(retry_after) if retry_after.isdigit() else None)
+        elif response.ok:
+            self.backoff.report_success()
+        
+        response.raise_for_status()
+        return response
+    
+    def _is_throttled_error(self, error):
+        """True if a library/subprocess error looks like YouTube throttling us."""
+        name = type(error).__name__
+        return name in ('RequestBlocked', 'IpBlocked', 'TooManyRequests') or '429' in str(error)
+    
+    def _fetch_watch_page(self, video_id, use_cache=True):
+        """
+        Download the watch page once and parse everything we need from it.
+        Returns dict with title, innertube_key and caption_tracks (LRU-cached per
+        video for PAGE_CACHE_TTL; use_cache=False forces a fresh download).
+        """
+        if use_cache:
+            with self._pages_lock:
+                entry = self._pages.get(video_id)
+                if entry is not None:
+                    fetched_at, page = entry
+                    if time.time() - fetched_at < PAGE_CACHE_TTL:
+                        self._pages.move_to_end(video_id)
+                        return page
+                    del self._pages[video_id]
+        
+        url = f"https://www.youtube.com/watch?v={video_id}"
+        response = self._request('GET', url, timeout=10)
+        page = self._parse_watch_page(response.text)
+        
+        # Consent/bot-check pages carry neither the player response nor the API key
+        if page['parsed']:
+            with self._pages_lock:
+                self._pages[video_id] = (time.time(), page)
+                self._pages.move_to_end(video_id)
+                while len(self._pages) > PAGE_CACHE_SIZE:
+                    self._pages.popitem(last=False)
+        return page
+    
+    def _parse_watch_page(self, page_html):
+        """Pull title, INNERTUBE_API_KEY and caption tracks out of the watch HTML."""
+        page = {'title': '', 'innertube_key': None, 'caption_tracks': [], 'parsed': False}
+        
+        match = re.search(r'"INNERTUBE_API_KEY":"([^"]+)"', page_html)
+        if match:
+            page['innertube_key'] = match.group(1)
+        
+        # ytInitialPlayerResponse is a JSON literal assigned inline in a <script>
+        player = {}
+        match = re.search(r'ytInitialPlayerResponse\s*=\s*\{', page_html)
+        if match:
+            try:
+                player, _ = json.JSONDecoder().raw_decode(page_html, match.end() - 1)
+            except ValueError:
+                player = {}
+        
+        page['title'] = player.get('videoDetails', {}).get('title', '')
+        renderer = player.get('captions', {}).get('playerCaptionsTracklistRenderer', {})
+        page['caption_tracks'] = renderer.get('captionTracks', [])
+        page['parsed'] = bool(player or page['innertube_key'])
+        
+        if not page['title']:
+            match = re.search(r'<title>(.*?)(?:\s*-\s*YouTube)?\s*</title>', page_html)
             if match:
-                import html
-                return html.unescape(match.group(1)).strip()
+                page['title'] = html.unescape(match.group(1)).strip()
+        return page
+    
+    def _get_title(self, video_id, use_cache=True):
+        """Get video title from the (shared) watch page fetch."""
+        try:
+            title = self._fetch_watch_page(video_id, use_cache)['title']
+            if title:
+                return title
         except Exception:
             pass
         return 'Unknown Title'
@@ -36,10 +172,18 @@ class TranscriptExtractor:
     def _extract_with_library(self, video_id):
         """Primary method: Use youtube-transcript-api library (v1.2+)."""
         # First, list available transcripts to find the best one
-        transcript_list = list(self.api.list(video_id))
+        self._throttle()
+        try:
+            transcript_list = list(self.api.list(video_id))
+        except (TranscriptsDisabled, NoTranscriptFound) as e:
+            raise NoCaptionsError(str(e))
+        except Exception as e:
+            if self._is_throttled_error(e):
+                self.backoff.report_throttled()
+            raise
         
         if not transcript_list:
-            raise Exception("No transcripts available")
+            raise NoCaptionsError("No transcripts available")
         
         # Collect all available language codes
         available_langs = [t.language_code for t in transcript_list]
@@ -59,106 +203,239 @@ class TranscriptExtractor:
             lang_to_use = available_langs[0]
         
         # Fetch the transcript
-        result = self.api.fetch(video_id, languages=[lang_to_use])
+        self._throttle()
+        try:
+            result = self.api.fetch(video_id, languages=[lang_to_use])
+        except Exception as e:
+            if self._is_throttled_error(e):
+                self.backoff.report_throttled()
+            raise
+        self.backoff.report_success()
+        
+        # Keep timing alongside the snippet text
+        timed = TimedTranscript.from_segments(
+            (snippet.start, snippet.duration, snippet.text) for snippet in result
+        )
+        return timed, lang_to_use
+    
+    def _all_cookie_sources(self):
+        """Every cookie source worth probing, most specific first."""
+        sources = []
+        if config.YTDLP_COOKIES_FILE and os.path.exists(config.YTDLP_COOKIES_FILE):
+            sources.append(('cookies', config.YTDLP_COOKIES_FILE))
+        sources.extend(('cookies-from-browser', browser) for browser in COOKIE_BROWSERS)
+        sources.append(None)
+        return sources
+    
+    def _iter_cookie_sources(self):
+        """
+        Yield cookie sources for a yt-dlp run. While a working source is known
+        (and younger than COOKIE_REVALIDATE) it is yielded first; the rest are
+        only probed if the caller moves on because it failed. Sources that hit a
+        cookie error are skipped until COOKIE_REVALIDATE has passed.
+        """
+        now = time.time()
+        with self._cookie_lock:
+            resolved_at = self._cookie_resolved_at
+            remembered = self._cookie_source
+            failed = {
+                source for source, failed_at in self._cookie_failures.items()
+                if now - failed_at < COOKIE_REVALIDATE
+            }
+        
+        fresh = resolved_at is not None and now - resolved_at < COOKIE_REVALIDATE
+        if fresh:
+            yield remembered
+        
+        for source in self._all_cookie_sources():
+            if not (fresh and source == remembered) and source not in failed:
+                yield source
+    
+    def _remember_cookie_source(self, source):
+        """Cache a cookie source that yt-dlp accepted for the process lifetime."""
+        with self._cookie_lock:
+            self._cookie_source = source
+            self._cookie_resolved_at = time.time()
+    
+    def _forget_cookie_source(self, source):
+        """Drop a remembered cookie source after a cookie error and skip it for a while."""
+        with self._cookie_lock:
+            self._cookie_failures[source] = time.time()
+            if self._cookie_resolved_at is not None and self._cookie_source == source:
+                self._cookie_source = None
+                self._cookie_resolved_at = None
+    
+    def _is_cookie_error(self, source, stderr):
+        """True if yt-dlp failed because the cookie source is unusable."""
+        return bool(source) and ('cookie' in stderr.lower() or 'Could not copy' in stderr)
+    
+    def _ytdlp_command(self, video_ids, output_template, cookie_source=None):
+        """Build a yt-dlp subtitle-only command for one or more videos."""
+        cmd = [
+            'yt-dlp',
+            '--write-subs', '--write-auto-subs',
+            '--sub-langs', ','.join(YTDLP_SUB_LANGS),
+            '--skip-download',
+            '--sub-format', 'json3',
+            '-o', output_template,
+            '--no-warnings',
+            '--no-check-certificates',
+            '--ignore-errors'
+        ]
         
-        # Extract text from snippets
-        lines = [snippet.text for snippet in result]
-        return '\n'.join(lines)
+        if cookie_source:
+            option, value = cookie_source
+            cmd.insert(1, f'--{option}')
+            cmd.insert(2, value)
+        
+        cmd.extend(f'https://www.youtube.com/watch?v={vid}' for vid in video_ids)
+        return cmd
+    
+    def _run_ytdlp(self, cmd, timeout):
+        """Run yt-dlp (rate limited, no console window on Windows)."""
+        self._throttle()
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+        )
+        if '429' in result.stderr:
+            self.backoff.report_throttled()
+        return result
+    
+    def _read_ytdlp_subtitles(self, tmpdir, sub_files):
+        """Pick the preferred-language .json3 file and parse it. Returns (TimedTranscript, lang)."""
+        # Prefer Malayalam first (original language), then others
+        selected_file = None
+        
+        for lang in YTDLP_SUB_LANGS:
+            for f in sub_files:
+                if f'.{lang}.' in f:
+                    selected_file = f
+                    break
+            if selected_file:
+                break
+        
+        if not selected_file:
+            selected_file = sub_files[0]
+        
+        filepath = os.path.join(tmpdir, selected_file)
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        lang = selected_file.split('.')[-2] if selected_file.count('.') >= 2 else ''
+        return TimedTranscript.from_json3(data), lang
     
     def _extract_with_ytdlp(self, video_id):
         """Fallback method: Use yt-dlp to extract subtitles (better rate-limit handling)."""
         with tempfile.TemporaryDirectory() as tmpdir:
             output_template = os.path.join(tmpdir, "sub")
             
-            # Try with different cookie sources, then without
-            cookie_browsers = ['chrome', 'edge', 'firefox', None]
+            no_subtitles = False
             
-            for browser in cookie_browsers:
-                cmd = [
-                    'yt-dlp',
-                    '--write-subs', '--write-auto-subs',
-                    '--sub-langs', 'ml,en,hi,ta,te,kn',
-                    '--skip-download',
-                    '--sub-format', 'json3',
-                    '-o', output_template,
-                    '--no-warnings',
-                    '--no-check-certificates',
-                    f'https://www.youtube.com/watch?v={video_id}'
-                ]
-                
-                if browser:
-                    cmd.insert(1, '--cookies-from-browser')
-                    cmd.insert(2, browser)
+            # Remembered cookie source first; others only if it stops working
+            for source in self._iter_cookie_sources():
+                cmd = self._ytdlp_command([video_id], output_template, source)
                 
                 try:
-                    result = subprocess.run(
-                        cmd,
-                        capture_output=True,
-                        text=True,
-                        timeout=30,
-                        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-                    )
+                    result = self._run_ytdlp(cmd, timeout=30)
                     
                     # Check if any subtitle files were created
                     sub_files = [f for f in os.listdir(tmpdir) if f.endswith('.json3')]
                     
                     if sub_files:
-                        # Prefer Malayalam first (original language), then others
-                        preferred_order = ['ml', 'en', 'hi', 'ta', 'te', 'kn']
-                        selected_file = None
-                        
-                        for lang in preferred_order:
-                            for f in sub_files:
-                                if f'.{lang}.' in f:
-                                    selected_file = f
-                                    break
-                            if selected_file:
-                                break
-                        
-                        if not selected_file:
-                            selected_file = sub_files[0]
-                        
-                        filepath = os.path.join(tmpdir, selected_file)
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                        
-                        # Parse json3 format
-                        lines = []
-                        for event in data.get('events', []):
-                            segs = event.get('segs', [])
-                            if segs:
-                                text = ''.join(seg.get('utf8', '') for seg in segs).strip()
-                                if text and text != '\n':
-                                    lines.append(text)
-                        
-                        if lines:
-                            return '\n'.join(lines)
+                        transcript, lang = self._read_ytdlp_subtitles(tmpdir, sub_files)
+                        if transcript:
+                            self._remember_cookie_source(source)
+                            return transcript, lang
                     
-                    # Cookie error — try next browser
-                    if browser and ('cookie' in result.stderr.lower() or 'Could not copy' in result.stderr):
+                    # Cookie error — try next source
+                    if self._is_cookie_error(source, result.stderr):
+                        self._forget_cookie_source(source)
                         continue
                     
-                    # 429 without cookies — stop trying
-                    if not browser and '429' in result.stderr:
-                        break
+                    # Clean run but nothing written — the video has no captions
+                    if result.returncode == 0:
+                        self._remember_cookie_source(source)
+                        no_subtitles = True
+                    
+                    # Any other failure (unavailable video, 429, ...) is not
+                    # about cookies, so other sources won't fix it
+                    break
                         
-                except subprocess.TimeoutExpired:
-                    continue
                 except Exception:
-                    continue
+                    # Timeouts and launch errors won't improve with other cookies either
+                    break
             
+            if no_subtitles:
+                raise NoCaptionsError("No subtitles in any supported language")
             raise Exception("yt-dlp could not extract subtitles")
     
-    def _get_innertube_key(self, video_id):
-        """Fetch the video page and extract INNERTUBE_API_KEY."""
-        url = f"https://www.youtube.com/watch?v={video_id}"
-        response = self.session.get(url)
-        response.raise_for_status()
+    def _extract_batch_with_ytdlp(self, video_ids):
+        """
+        Batched fallback: one yt-dlp process for many videos, outputs named by
+        video ID and mapped back afterwards. Returns {video_id: (TimedTranscript, lang)}
+        for the videos that produced subtitles.
+        """
+        found = {}
         
-        match = re.search(r'"INNERTUBE_API_KEY":"([^"]+)"', response.text)
-        if not match:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_template = os.path.join(tmpdir, "%(id)s")
+            
+            # Remembered cookie source first; others only if it stops working
+            for source in self._iter_cookie_sources():
+                remaining = [vid for vid in video_ids if vid not in found]
+                if not remaining:
+                    break
+                
+                cmd = self._ytdlp_command(remaining, output_template, source)
+                
+                try:
+                    result = self._run_ytdlp(cmd, timeout=30 + 10 * len(remaining))
+                except subprocess.TimeoutExpired:
+                    result = None
+                except Exception:
+                    break
+                
+                # Files are named <video_id>.<lang>.json3
+                for vid in remaining:
+                    sub_files = [
+                        f for f in os.listdir(tmpdir)
+                        if f.startswith(f'{vid}.') and f.endswith('.json3')
+                    ]
+                    if not sub_files:
+                        continue
+                    try:
+                        transcript, lang = self._read_ytdlp_subtitles(tmpdir, sub_files)
+                    except Exception:
+                        continue
+                    if transcript:
+                        found[vid] = (transcript, lang)
+                
+                if result is None:
+                    break
+                
+                # Cookie error — try next source
+                if self._is_cookie_error(source, result.stderr):
+                    self._forget_cookie_source(source)
+                    continue
+                if result.returncode == 0 or found:
+                    self._remember_cookie_source(source)
+                
+                # Anything else means the remaining videos simply have no subtitles
+                # (or we are being throttled) — more cookie sources won't help
+                break
+        
+        return found
+    
+    def _get_innertube_key(self, video_id):
+        """Get INNERTUBE_API_KEY from the (shared) watch page fetch."""
+        api_key = self._fetch_watch_page(video_id)['innertube_key']
+        if not api_key:
             raise Exception("Could not find INNERTUBE_API_KEY")
-        return match.group(1)
+        return api_key
     
     def _get_caption_tracks(self, video_id, api_key):
         """Call the player endpoint to get caption track URLs."""
@@ -198,8 +475,7 @@ class TranscriptExtractor:
                     "videoId": video_id
                 }
                 
-                response = self.session.post(endpoint, json=payload)
-                response.raise_for_status()
+                response = self._request('POST', endpoint, json=payload)
                 
                 data = response.json()
                 title = data.get('videoDetails', {}).get('title', 'Unknown Title')
@@ -218,92 +494,256 @@ class TranscriptExtractor:
         raise Exception("No caption tracks found with any client")
     
     def _fetch_transcript_innertube(self, track_url):
-        """Fetch and parse the transcript JSON from InnerTube."""
+        """Fetch and parse the transcript JSON from InnerTube into a TimedTranscript."""
         if 'fmt=' in track_url:
             url = re.sub(r'fmt=[^&]+', 'fmt=json3', track_url)
         else:
             url = f"{track_url}&fmt=json3"
-        response = self.session.get(url)
-        response.raise_for_status()
+        response = self._request('GET', url)
         
-        data = response.json()
+        return TimedTranscript.from_json3(response.json())
+    
+    def _extract_with_innertube(self, video_id):
+        """Last resort: caption tracks from the watch page, else the InnerTube player endpoint."""
+        # Caption tracks embedded in the watch page save the player round-trip
+        tracks = list(self._fetch_watch_page(video_id)['caption_tracks'])
+        if not tracks:
+            api_key = self._get_innertube_key(video_id)
+            _, tracks = self._get_caption_tracks(video_id, api_key)
+        
+        if not tracks:
+            raise NoCaptionsError('No captions available for this video')
         
-        lines = []
-        for event in data.get('events', []):
-            segs = event.get('segs', [])
-            if segs:
-                text = ''.join(seg.get('utf8', '') for seg in segs).strip()
-                if text:
-                    lines.append(text)
+        tracks.sort(key=lambda t: (
+            0 if t.get('languageCode') == 'en' else 1,
+            0 if t.get('kind') != 'asr' else 1
+        ))
         
-        return '\n'.join(lines)
+        transcript = self._fetch_transcript_innertube(tracks[0]['baseUrl'])
+        return transcript, tracks[0].get('languageCode', '')
     
-    def extract(self, video_id):
+    def extract(self, video_id, use_cache=True, prefetched=None, segments=False):
         """
         Extract transcript for a single video.
-        Returns dict with video_id, title, transcript, success, error.
+        `prefetched` holds results of a batched yt-dlp run ({video_id: (TimedTranscript, lang) or None}).
+        Returns dict with video_id, title, transcript, language, method, cached,
+        elapsed (seconds), success, error — plus timed `segments` if requested.
         """
+        started = time.perf_counter()
+        result = self._extract(video_id, use_cache, prefetched or {})
+        timed = result.pop('timed', None)
+        if segments:
+            result['segments'] = timed.segments() if timed else []
+        result['elapsed'] = round(time.perf_counter() - started, 3)
+        return result
+    
+    def _extract(self, video_id, use_cache, prefetched):
+        """Cache lookup followed by the transcript backends in adaptive order."""
         result = {
             'video_id': video_id,
             'title': '',
             'transcript': '',
+            'language': '',
+            'method': '',
+            'cached': False,
             'success': False,
             'error': None
         }
         
-        # Get title first
-        result['title'] = self._get_title(video_id)
-        
-        # Method 1: youtube-transcript-api library (most reliable)
-        try:
-            transcript = self._extract_with_library(video_id)
-            if transcript:
-                result['transcript'] = transcript
-                result['success'] = True
-                return result
-        except Exception as e:
-            method1_error = str(e)
-        
-        # Method 2: yt-dlp fallback (handles rate-limiting better)
-        try:
-            transcript = self._extract_with_ytdlp(video_id)
-            if transcript:
-                result['transcript'] = transcript
+        # Serve repeat requests straight from the disk cache
+        if use_cache:
+            cached = self.cache.get(video_id)
+            if cached and 'timed' in cached:
+                timed = TimedTranscript.from_dict(cached.pop('timed'))
+                result.update(cached)
+                result['transcript'] = timed.text()
+                result['timed'] = timed
+                result['cached'] = True
                 result['success'] = True
                 return result
-        except Exception as e:
-            method2_error = str(e)
-        
-        # Method 3: InnerTube API with multiple client fallback
-        try:
-            api_key = self._get_innertube_key(video_id)
-            title, tracks = self._get_caption_tracks(video_id, api_key)
-            if title and title != 'Unknown Title':
-                result['title'] = title
             
-            if not tracks:
+            missing = self.negative_cache.get(video_id)
+            if missing:
+                result['title'] = missing.get('title', '')
                 result['error'] = 'No captions available for this video'
+                result['cached'] = True
                 return result
+        
+        # Get title first
+        # A refresh re-downloads the page; the backends then reuse that fresh copy
+        result['title'] = self._get_title(video_id, use_cache)
+        
+        # Healthiest/fastest backend first; open circuits are skipped
+        order, skipped = self.backend_stats.ranked()
+        errors = [f"{name}: skipped (circuit open)" for name in skipped]
+        
+        # Already tried by a batched yt-dlp run
+        if video_id in prefetched:
+            if prefetched[video_id]:
+                transcript, lang = prefetched[video_id]
+                return self._finish(result, transcript, lang, 'yt-dlp')
+            order = [name for name in order if name != 'yt-dlp']
+            errors.append("yt-dlp: no subtitles from batched run")
+        no_captions = 0
+        
+        for name in order:
+            started = time.perf_counter()
+            try:
+                transcript, lang = self._backends[name](video_id)
+            except NoCaptionsError as e:
+                # The backend answered correctly, so it counts as healthy
+                self.backend_stats.record(name, True, time.perf_counter() - started)
+                errors.append(f"{name}: {e}")
+                no_captions += 1
+                continue
+            except Exception as e:
+                self.backend_stats.record(name, False, time.perf_counter() - started)
+                errors.append(f"{name}: {e}")
+                continue
             
-            tracks.sort(key=lambda t: (
-                0 if t.get('languageCode') == 'en' else 1,
-                0 if t.get('kind') != 'asr' else 1
-            ))
-            
-            transcript = self._fetch_transcript_innertube(tracks[0]['baseUrl'])
-            
-            if not transcript:
-                result['error'] = 'Transcript is empty'
-                return result
-            
-            result['transcript'] = transcript
-            result['success'] = True
-            
-        except Exception as e:
-            result['error'] = f"All methods failed. Library: {method1_error} | yt-dlp: {method2_error} | InnerTube: {str(e)}"
+            self.backend_stats.record(name, bool(transcript), time.perf_counter() - started)
+            if transcript:
+                return self._finish(result, transcript, lang, name)
+            errors.append(f"{name}: Transcript is empty")
         
+        if no_captions and no_captions == len(order):
+            result['error'] = 'No captions available for this video'
+            self.negative_cache.set(video_id, {'title': result['title']})
+        else:
+            result['error'] = f"All methods failed. {' | '.join(errors)}"
         return result
     
-    def extract_batch(self, video_ids):
-        """Extract transcripts for multiple videos."""
-        return [self.extract(vid) for vid in video_ids]
+    def _finish(self, result, timed, language, method):
+        """Mark result as successful and store its compact form in the transcript cache."""
+        result['transcript'] = timed.text()
+        result['timed'] = timed
+        result['language'] = language
+        result['method'] = method
+        result['success'] = True
+        
+        self.cache.set(result['video_id'], {
+            'title': result['title'],
+            'timed': timed.to_dict(),
+            'language': language,
+            'method': method
+        })
+        return result
+    
+    def cache_stats(self):
+        """Return transcript cache hit/miss counters (negative cache included)."""
+        stats = self.cache.stats()
+        stats['negative'] = self.negative_cache.stats()
+        return stats
+    
+    def get_backend_stats(self):
+        """Return live success rate, latency and circuit state per backend."""
+        stats = self.backend_stats.snapshot()
+        with self._cookie_lock:
+            source = self._cookie_source
+            resolved = self._cookie_resolved_at is not None
+        stats['backoff'] = self.backoff.status()
+        stats['ytdlp_cookie_source'] = (
+            (':'.join(source) if source else 'none') if resolved else 'unresolved'
+        )
+        return stats
+    
+    def _prefetch_batches(self, video_ids, use_cache):
+        """
+        When the primary backend is throttled (circuit open, or yt-dlp ranked
+        first), group the uncached videos into batched yt-dlp runs so fallback
+        throughput scales with batch size rather than process count.
+        Returns a list of video ID batches (empty when prefetching isn't worth it).
+        """
+        order, skipped = self.backend_stats.ranked()
+        if 'yt-dlp' in skipped or not ('library' in skipped or order[0] == 'yt-dlp'):
+            return []
+        
+        pending = [
+            vid for vid in dict.fromkeys(video_ids)
+            if not (use_cache and (self.cache.has(vid) or self.negative_cache.has(vid)))
+        ]
+        if len(pending) < 2:
+            return []
+        return [pending[start:start + YTDLP_BATCH_SIZE] for start in range(0, len(pending), YTDLP_BATCH_SIZE)]
+    
+    def _prefetch_batch(self, batch):
+        """Run one batched yt-dlp fetch. Returns {video_id: (TimedTranscript, lang) or None}."""
+        started = time.perf_counter()
+        try:
+            found = self._extract_batch_with_ytdlp(batch)
+        except Exception:
+            found = {}
+        per_video = (time.perf_counter() - started) / len(batch)
+        
+        # Misses may just be videos without captions, so only a fully
+        # empty batch counts against yt-dlp's health
+        for vid in found:
+            self.backend_stats.record('yt-dlp', True, per_video)
+        if not found:
+            self.backend_stats.record('yt-dlp', False, per_video * len(batch))
+        return {vid: found.get(vid) for vid in batch}
+    
+    def _prefetch_with_ytdlp(self, video_ids, use_cache):
+        """Run every prefetch batch up front. Returns {video_id: (TimedTranscript, lang) or None}."""
+        prefetched = {}
+        for batch in self._prefetch_batches(video_ids, use_cache):
+            prefetched.update(self._prefetch_batch(batch))
+        return prefetched
+    
+    def extract_batch(self, video_ids, use_cache=True, workers=None, segments=False):
+        """
+        Extract transcripts for multiple videos in parallel.
+        Results keep the input order; youtube.com requests from all workers
+        share one rate limiter.
+        """
+        prefetched = self._prefetch_with_ytdlp(video_ids, use_cache)
+        workers = max(1, min(workers or BATCH_WORKERS, len(video_ids)))
+        
+        def run(vid):
+            return self.extract(vid, use_cache, prefetched, segments)
+        
+        if workers == 1:
+            return [run(vid) for vid in video_ids]
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(run, video_ids))
+    
+    def extract_iter(self, video_ids, use_cache=True, workers=None, segments=False):
+        """
+        Like extract_batch, but yields (index, result) as soon as each video
+        finishes so callers can stream results.
+        """
+        if not video_ids:
+            return
+        # yt-dlp batches run inside the pool; each batch's videos are released
+        # as soon as that batch finishes, so cached videos stream right away
+        batches = self._prefetch_batches(video_ids, use_cache)
+        batched = {vid for batch in batches for vid in batch}
+        workers = max(1, min(workers or BATCH_WORKERS, len(video_ids)))
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            
+            def submit(vid, index, prefetched):
+                future = pool.submit(self.extract, vid, use_cache, prefetched, segments)
+                futures[future] = index
+                return future
+            
+            pending = {
+                submit(vid, index, None)
+                for index, vid in enumerate(video_ids) if vid not in batched
+            }
+            batch_futures = {pool.submit(self._prefetch_batch, batch) for batch in batches}
+            pending |= batch_futures
+            
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in batch_futures:
+                        prefetched = future.result()
+                        pending |= {
+                            submit(vid, index, prefetched)
+                            for index, vid in enumerate(video_ids) if vid in prefetched
+                        }
+                    else:
+                        yield futures[future], future.result()
@@ -1,10 +1,43 @@
-from google import genai
 from deep_translator import GoogleTranslator
 import config
 import re
+import json
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from text_compactor import compact_transcript, estimate_tokens
+from disk_cache import DiskCache
+from backend_stats import BackendStats
+from rate_limit import AdmissionScheduler
+from llm_clients import clients
 
 
-# Global current model state
+# ===== CONFIGURATION =====
+CACHE_TTL = 30 * 24 * 3600     # Translations of the same text/model are stable
+CACHE_MAX_ENTRIES = 2000       # LRU eviction above this many translations
+DEFAULT_CHUNK_TOKENS = 3000    # Chunk budget for models without chunk_tokens in config
+CHUNK_WORKERS = 4              # Chunks translated concurrently per request
+FANOUT_WORKERS = 6             # Target languages translated concurrently per fan-out request
+MODEL_LATENCY_PRIOR = 5.0      # Assumed seconds per AI call before any calls are recorded
+HEDGE_DEFAULT_DELAY = 8.0      # Hedge after this long when the primary has no latency history
+HEDGE_MIN_DELAY = 2.0          # Never hedge sooner than this, even for very fast models
+SENTENCE_CACHE_MAX_ENTRIES = 50000   # Google Translate sentences kept across all languages
+GOOGLE_BATCH_CHARS = 4500      # Google Translate accepts ~5000 characters per request
+
+# Sentence boundaries (kept as separators so documents reassemble exactly)
+SENTENCE_BOUNDARY = re.compile(r'(\n+|(?<=[.!?…])[ \t]+)')
+
+# Where long texts may be split for chunked translation, coarsest first: (boundary, joiner)
+CHUNK_BOUNDARIES = [
+    (re.compile(r'\n\n'), '\n\n'),             # paragraphs
+    (re.compile(r'\n'), '\n'),                 # caption lines
+    (re.compile(r'(?<=[.!?…])\s+'), ' '),       # sentences
+    (re.compile(r'\s+'), ' ')                   # words
+]
+
+
+# Global default model; requests may pick their own with model=...
 _current_model = config.DEFAULT_MODEL
 
 
@@ -29,8 +62,8 @@ class TranslationService:
         'ko': 'Korean'
     }
     
-    # Custom prompt for voiceover-ready translations (works for all AI models)
-    ENGLISH_PROMPT = """You are a professional translator specializing in sports content localization for voiceover.
+    # Translation rules shared by the plain and pipeline prompts
+    TRANSLATION_RULES = """You are a professional translator specializing in sports content localization for voiceover.
 
 CRITICAL OUTPUT FORMAT RULES:
 1. Output as CONTINUOUS FLOWING PARAGRAPHS - NO line breaks within sentences
@@ -45,24 +78,76 @@ CONTENT RULES:
 5. NO extra commentary or explanations
 6. Maintain the original meaning and context
 7. Use proper sentence structure, not word-by-word translation
-8. Keep sports terminology accurate (Ballon d'Or, not "ballad" or "golden ball")
+8. Keep sports terminology accurate (Ballon d'Or, not "ballad" or "golden ball")"""
+    
+    # Custom prompt for voiceover-ready translations (works for all AI models)
+    ENGLISH_PROMPT = TRANSLATION_RULES + """
 
 Translate the following text to English:
 
 {text}
 
 Provide ONLY the translated text as flowing paragraphs, nothing else."""
+    
+    # Bump whenever ENGLISH_PROMPT changes so cached translations are not reused
+    ENGLISH_PROMPT_VERSION = '1'
+    
+    # Rules for the Spanish YouTube metadata (shared by the production and pipeline prompts)
+    PRODUCTION_RULES = """RULES FOR EACH FIELD:
+- title: TRANSLATE the original title to Spanish. Keep the SAME structure and format (including any | separators). The original title may be in Malayalam, English, or any language — translate it accurately to Spanish. Add 🚨 at start and make ALL UPPERCASE. Keep English words like "Football", "Champions League", team names, player names as they are.
+- description: 5-8 sentences, SEO-optimized, include emojis, hashtags at end (lowercase like #futbol #barcelona), NO bold/markdown formatting
+- tags: 10-15 tags separated by commas, all lowercase, include player names, team names, relevant topics"""
+    
+    PRODUCTION_PROMPT = """Generate YouTube production content in Spanish for this football video.
+
+ORIGINAL TITLE: {title}
+
+ENGLISH CONTENT: {text}
+
+Return a JSON object with the string fields "title", "description" and "tags".
+
+{rules}"""
+    
+    # Translation + production metadata in one structured-output call. Built from the
+    # rules only: ENGLISH_PROMPT's "ONLY the translated text" ending would contradict JSON.
+    PIPELINE_PROMPT = """{translation_rules}
+
+Translate the following text to English:
+
+{text}
+
+Also generate YouTube production content in Spanish for this football video.
+ORIGINAL TITLE: {title}
+
+Return ONLY a JSON object (no markdown, no other text) with the string fields:
+- "english_text": the English translation, following the translation rules above
+- "title", "description", "tags": the Spanish production content
+
+{rules}"""
+    
+    PRODUCTION_FIELDS = ('title', 'description', 'tags')
+    PIPELINE_FIELDS = ('english_text', 'title', 'description', 'tags')
+    PRODUCTION_PROMPT_VERSION = '2'
 
     def __init__(self):
-        self.gemini_client = genai.Client(api_key=config.GEMINI_API_KEY)
-        self.groq_client = None
-        # Initialize Groq client if API key is available
-        if config.GROQ_API_KEY:
-            try:
-                from groq import Groq
-                self.groq_client = Groq(api_key=config.GROQ_API_KEY)
-            except ImportError:
-                print("Warning: Groq package not installed. Run: pip install groq")
+        self.cache = DiskCache('translations', ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+        # Recurring sentences (sponsor lines, closings, ...) are translated once per language
+        self.sentence_cache = DiskCache('google_sentences', ttl=CACHE_TTL,
+                                        max_entries=SENTENCE_CACHE_MAX_ENTRIES)
+        # Latency/success tracking per AI model drives hedging and failover
+        self.model_stats = BackendStats({name: MODEL_LATENCY_PRIOR for name in config.AVAILABLE_MODELS})
+        # Per-model RPM/TPM admission so batch load queues instead of hitting 429s
+        self.limiter = AdmissionScheduler(config.AVAILABLE_MODELS)
+    
+    @property
+    def gemini_client(self):
+        """Shared, pooled Gemini/Gemma client."""
+        return clients.get('google')
+    
+    @property
+    def groq_client(self):
+        """Shared, pooled Groq client (None if not configured)."""
+        return clients.get('groq')
     
     @staticmethod
     def get_current_model():
@@ -84,42 +169,687 @@ Provide ONLY the translated text as flowing paragraphs, nothing else."""
         """Return available models with their info."""
         return config.AVAILABLE_MODELS
     
-    def translate(self, text, target_lang='en'):
+    def translate(self, text, target_lang='en', compact=True, use_cache=True, chunked=True, hedge=True,
+                  model=None):
         """
         Translate text to target language.
-        - English: Uses AI model (Gemini/Gemma/Groq)
+        - English: Uses AI model (Gemini/Gemma/Groq); captions are compacted first unless compact=False.
+          Texts longer than the model's chunk budget are split and translated in parallel unless chunked=False.
+          Errors fail over to the backup models; with hedge=True a slow primary is also raced
+          against a backup once it exceeds its p90 latency.
+          model picks the AI model for this request (defaults to the globally selected one).
         - Other languages: Uses Google Translate (free, no API limits)
+        Successful results are cached on disk under the model that answered;
+        use_cache=False forces a fresh call.
         """
         try:
+            model = self._resolve_model(model)
+            key = self._cache_key(text, target_lang, compact, model)
+            if use_cache:
+                cached = self._cache_lookup(lambda name: self._cache_key(text, target_lang, compact, name), model)
+                if cached:
+                    cached['cached'] = True
+                    return cached
+            
             if target_lang == 'en':
-                return self._translate_with_ai(text)
+                result = self._translate_with_ai(text, model, compact, chunked, hedge)
+                key = self._winner_cache_key(result, lambda winner: self._cache_key(text, 'en', compact, winner))
             else:
-                return self._translate_with_google(text, target_lang)
+                result = self._translate_with_google(text, target_lang)
+            
+            if result.get('success') and key:
+                self.cache.set(key, result)
+            result['cached'] = False
+            return result
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e)
             }
     
-    def _translate_with_ai(self, text):
-        """Translate to English using current AI model."""
-        global _current_model
-        prompt = self.ENGLISH_PROMPT.format(text=text)
+    def translate_many(self, text, target_langs, use_cache=True, model=None):
+        """
+        Fan-out: translate the same text into several languages concurrently.
+        Returns {lang: result}; unknown language codes get an error result.
+        """
+        return dict(self.translate_iter(text, target_langs, use_cache=use_cache, model=model))
+    
+    def translate_iter(self, text, target_langs, use_cache=True, model=None):
+        """Like translate_many(), but yields (lang, result) as each language completes."""
+        targets = list(dict.fromkeys(target_langs))  # de-duplicate, keep order
+        valid = [lang for lang in targets if lang in self.LANGUAGES]
+        
+        for lang in targets:
+            if lang not in self.LANGUAGES:
+                yield lang, {'success': False, 'error': f'Unsupported language: {lang}'}
+        if not valid:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(FANOUT_WORKERS, len(valid))) as pool:
+            futures = {
+                pool.submit(self.translate, text, lang, use_cache=use_cache, model=model): lang
+                for lang in valid
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    
+    def generate_production(self, title, english_text, model=None, hedge=True):
+        """
+        Spanish YouTube title/description/tags for an already translated video,
+        as one schema-validated structured-output call.
+        """
+        try:
+            model = self._resolve_model(model)
+            prompt = self.PRODUCTION_PROMPT.format(title=title, text=english_text[:1000],
+                                                   rules=self.PRODUCTION_RULES)
+            result = self._translate_prompt(prompt, model, hedge, fields=self.PRODUCTION_FIELDS)
+            if not result.get('success'):
+                return result
+            
+            return dict({field: result['data'][field] for field in self.PRODUCTION_FIELDS},
+                        success=True, model_used=result['model'], hedged=result.get('hedged', False))
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def translate_with_production(self, text, title, compact=True, use_cache=True, chunked=True,
+                                  hedge=True, model=None):
+        """
+        Fused pipeline: English translation plus Spanish production metadata in one
+        structured-output call (instead of translate() followed by generate_production()).
+        Long transcripts fuse the metadata into the first chunk's call; the remaining
+        chunks are translated in parallel as usual. The English text is also stored in
+        the plain translation cache.
+        """
+        try:
+            model = self._resolve_model(model)
+            if use_cache:
+                cached = self._cache_lookup(lambda name: self._pipeline_cache_key(text, title, compact, name), model)
+                if cached:
+                    cached['cached'] = True
+                    return cached
+            
+            source = text
+            compaction = None
+            if compact:
+                text, compaction = compact_transcript(text)
+            
+            chunk_tokens = config.AVAILABLE_MODELS.get(model, {}).get('chunk_tokens', DEFAULT_CHUNK_TOKENS)
+            chunks = self._split_into_chunks(text, chunk_tokens) if chunked else [text]
+            prompt = self.PIPELINE_PROMPT.format(
+                translation_rules=self.TRANSLATION_RULES,
+                text=chunks[0],
+                title=title,
+                rules=self.PRODUCTION_RULES
+            )
+            
+            with ThreadPoolExecutor(max_workers=CHUNK_WORKERS) as pool:
+                rest = pool.submit(self._translate_chunks, chunks[1:], model, hedge) if len(chunks) > 1 else None
+                fused = self._translate_prompt(prompt, model, hedge, fields=self.PIPELINE_FIELDS,
+                                               text_tokens=estimate_tokens(chunks[0]))
+                rest_result = rest.result() if rest else None
+            
+            if not fused.get('success'):
+                return fused
+            if rest_result and not rest_result.get('success'):
+                return rest_result
+            
+            parts = [self._normalize_line_breaks(fused['data']['english_text'])]
+            if rest_result:
+                parts.append(rest_result['translated_text'])
+            
+            result = {
+                'success': True,
+                'translated_text': '\n\n'.join(parts),
+                'target_lang': 'en',
+                'method': 'ai',
+                'model': fused['model'],
+                'hedged': fused.get('hedged', False) or bool(rest_result and rest_result.get('hedged')),
+                'production': {field: fused['data'][field] for field in self.PRODUCTION_FIELDS}
+            }
+            if len(chunks) > 1:
+                result['chunks'] = len(chunks)
+            if compaction:
+                result['compaction'] = compaction
+            
+            if rest_result:
+                result['models'] = [fused['model']] + rest_result['models']
+            
+            winner = self._winner_cache_key(result, lambda name: name)
+            if winner:
+                self.cache.set(self._pipeline_cache_key(source, title, compact, winner), result)
+                translation = {k: v for k, v in result.items() if k not in ('production', 'cached')}
+                self.cache.set(self._cache_key(source, 'en', compact, winner), translation)
+            result['cached'] = False
+            return result
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def translate_stream(self, text, target_lang='en', compact=True, use_cache=True, chunked=True,
+                         hedge=True, model=None):
+        """
+        Streaming variant of translate(). Yields (event, payload) tuples:
+        ('delta', text) as the translation arrives, then ('done', result),
+        or ('error', {'success': False, 'error': ...}) on failure.
+        For chunked texts the first chunk streams live while the rest are
+        translated in the background and emitted in order. If the stream fails
+        before producing any text, it falls back to a non-streaming failover call.
+        """
+        try:
+            requested = self._resolve_model(model)
+            key = self._cache_key(text, target_lang, compact, requested)
+            if use_cache:
+                cached = self._cache_lookup(lambda name: self._cache_key(text, target_lang, compact, name), requested)
+                if cached:
+                    cached['cached'] = True
+                    yield 'delta', cached['translated_text']
+                    yield 'done', cached
+                    return
+            
+            # Google Translate has no streaming API - send the whole result at once
+            if target_lang != 'en':
+                result = self._translate_with_google(text, target_lang)
+                self.cache.set(key, result)
+                result['cached'] = False
+                yield 'delta', result['translated_text']
+                yield 'done', result
+                return
+            
+            # Stream from the requested model unless its circuit is open
+            model = self._model_candidates(requested)[0]
+            
+            source = text
+            compaction = None
+            if compact:
+                text, compaction = compact_transcript(text)
+            
+            # Sized for the model that actually streams (a backup when the primary's circuit is open)
+            model_info = config.AVAILABLE_MODELS.get(model, {})
+            chunk_tokens = model_info.get('chunk_tokens', DEFAULT_CHUNK_TOKENS)
+            chunks = self._split_into_chunks(text, chunk_tokens) if chunked else [text]
+            prompts = [self.ENGLISH_PROMPT.format(text=chunk) for chunk in chunks]
+            
+            parts = []
+            with ThreadPoolExecutor(max_workers=CHUNK_WORKERS) as pool:
+                rest = [
+                    pool.submit(self._translate_prompt, prompt, requested, hedge, text_tokens=estimate_tokens(chunk))
+                    for chunk, prompt in zip(chunks[1:], prompts[1:])
+                ]
+                
+                first = []
+                self.admit(model, prompts[0])
+                start = time.time()
+                try:
+                    for piece in self._normalize_stream(self._stream_prompt(prompts[0], model)):
+                        first.append(piece)
+                        yield 'delta', piece
+                    self.model_stats.record(model, True, time.time() - start)
+                except Exception as e:
+                    self.model_stats.record(model, False, time.time() - start)
+                    if first:
+                        raise
+                    print(f"Streaming from {model} failed ({e}), falling back")
+                    fallback = self._translate_prompt(prompts[0], requested, hedge,
+                                                      text_tokens=estimate_tokens(chunks[0]))
+                    if not fallback.get('success'):
+                        raise RuntimeError(fallback.get('error'))
+                    model = fallback['model']
+                    first.append(fallback['translated_text'])
+                    yield 'delta', fallback['translated_text']
+                parts.append(''.join(first))
+                models = [model]
+                
+                for index, future in enumerate(rest, start=2):
+                    chunk_result = future.result()
+                    if not chunk_result.get('success'):
+                        raise RuntimeError(f"Chunk {index} of {len(prompts)} failed: {chunk_result.get('error')}")
+                    yield 'delta', '\n\n' + chunk_result['translated_text']
+                    parts.append(chunk_result['translated_text'])
+                    models.append(chunk_result['model'])
+            
+            result = {
+                'success': True,
+                'translated_text': '\n\n'.join(parts),
+                'target_lang': 'en',
+                'method': 'ai',
+                'model': models[0]
+            }
+            if len(prompts) > 1:
+                result['chunks'] = len(prompts)
+                result['models'] = models
+            if compaction:
+                result['compaction'] = compaction
+            
+            key = self._winner_cache_key(result, lambda winner: self._cache_key(source, 'en', compact, winner))
+            if key:
+                self.cache.set(key, result)
+            result['cached'] = False
+            yield 'done', result
+        except Exception as e:
+            yield 'error', {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _resolve_model(self, model):
+        """Per-request model, or the global default when none is given."""
+        if not model:
+            global _current_model
+            return _current_model
+        if model not in config.AVAILABLE_MODELS:
+            raise ValueError(f'Unknown model: {model}')
+        return model
+    
+    def _cache_key(self, text, target_lang, compact, model):
+        """Content address: normalized text + target language + model + prompt version."""
+        if target_lang == 'en':
+            engine = f"{model}|prompt-v{self.ENGLISH_PROMPT_VERSION}|compact={int(bool(compact))}"
+        else:
+            engine = 'google'
+        normalized = ' '.join(text.split())
+        digest = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        return f"{target_lang}|{engine}|{digest}"
+    
+    def _cache_lookup(self, make_key, model):
+        """
+        Cached result for model, else one a hedge/failover backup produced for the
+        same request (those are stored under the model that answered).
+        make_key(model_name) builds the cache key.
+        """
+        key = make_key(model)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+        for backup in config.FALLBACK_MODELS:
+            backup_key = make_key(backup)
+            # has() first so probing backups doesn't count as cache misses
+            if backup_key != key and self.cache.has(backup_key):
+                return self.cache.get(backup_key)
+        return None
+    
+    def _winner_cache_key(self, result, make_key):
+        """
+        Cache key for a fresh AI result, filed under the model that actually answered
+        (a failover or hedge winner must not fill the requested model's entry).
+        None when chunks were answered by different models.
+        """
+        models = set(result.get('models') or [result.get('model')])
+        if len(models) != 1 or None in models:
+            return None
+        return make_key(models.pop())
+    
+    def _pipeline_cache_key(self, text, title, compact, model):
+        """Content address for fused translation + production results."""
+        engine = (f"{model}|prompt-v{self.ENGLISH_PROMPT_VERSION}.{self.PRODUCTION_PROMPT_VERSION}"
+                  f"|compact={int(bool(compact))}")
+        normalized = ' '.join(f"{title}\n{text}".split())
+        digest = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        return f"pipeline|{engine}|{digest}"
+    
+    def cache_stats(self):
+        """Return translation cache hit/miss counters (sentence cache included)."""
+        stats = self.cache.stats()
+        stats['sentences'] = self.sentence_cache.stats()
+        return stats
+    
+    def _translate_with_ai(self, text, model, compact=True, chunked=True, hedge=True):
+        """Translate to English using the given AI model."""
+        # Drop rolling-caption repeats and fillers so we don't pay for duplicate tokens
+        compaction = None
+        if compact:
+            text, compaction = compact_transcript(text)
+        
+        model_info = config.AVAILABLE_MODELS.get(model, {})
+        chunk_tokens = model_info.get('chunk_tokens', DEFAULT_CHUNK_TOKENS)
+        
+        # Long transcripts are split to fit the model's output limit
+        chunks = self._split_into_chunks(text, chunk_tokens) if chunked else [text]
+        
+        if len(chunks) == 1:
+            result = self._translate_prompt(self.ENGLISH_PROMPT.format(text=chunks[0]), model, hedge,
+                                            text_tokens=estimate_tokens(chunks[0]))
+        else:
+            result = self._translate_chunks(chunks, model, hedge)
+        
+        if compaction:
+            result['compaction'] = compaction
+        return result
+    
+    def _translate_prompt(self, prompt, model, hedge=True, fields=None, text_tokens=None):
+        """
+        Send one prompt to model, failing over to backup models on errors.
+        With hedge=True, a backup is also started if the primary is still running after
+        its p90 latency; whichever succeeds first wins. The result records the winning
+        model, every model tried ('attempts'), and whether a hedge was fired.
+        With fields, the call requests structured JSON output and the validated
+        object is returned as result['data']; invalid output also fails over.
+        The primary is admitted by the rate limiter before the hedge timer starts,
+        so time spent queued for quota never triggers a hedge.
+        text_tokens is the size of the text being translated (defaults to the whole
+        prompt); backups whose chunk budget or TPM quota can't take it are not used.
+        """
+        if text_tokens is None:
+            text_tokens = estimate_tokens(prompt)
+        candidates = self._model_candidates(model, text_tokens, estimate_tokens(prompt))
+        delay = max(HEDGE_MIN_DELAY, self.model_stats.percentile(candidates[0], 90) or HEDGE_DEFAULT_DELAY)
         
-        model_info = config.AVAILABLE_MODELS.get(_current_model, {})
+        attempts = []
+        errors = []
+        pending = set()
+        hedged = False
+        
+        def launch(admitted=False):
+            name = candidates[len(attempts)]
+            attempts.append(name)
+            pending.add(self._call_model_async(prompt, name, fields, admitted))
+        
+        self.admit(candidates[0], prompt)
+        launch(admitted=True)
+        while pending:
+            can_hedge = hedge and len(attempts) < len(candidates)
+            done, pending = wait(pending, timeout=delay if can_hedge else None, return_when=FIRST_COMPLETED)
+            
+            if not done:
+                # Primary is slower than usual - race it against the next backup
+                hedged = True
+                launch()
+                continue
+            
+            for future in done:
+                result = future.result()
+                if result.get('success'):
+                    result['attempts'] = list(attempts)
+                    result['hedged'] = hedged
+                    return result
+                errors.append(f"{result.get('model')}: {result.get('error')}")
+            
+            # Fail over: replace the failed attempt with the next backup
+            if not pending and len(attempts) < len(candidates):
+                launch()
+        
+        return {
+            'success': False,
+            'error': 'All models failed - ' + '; '.join(errors),
+            'attempts': attempts
+        }
+    
+    def _model_candidates(self, primary, text_tokens=None, prompt_tokens=None):
+        """
+        Primary model followed by usable backups, best-scoring first; open circuits are skipped.
+        With text_tokens/prompt_tokens, only backups that fit the request are included.
+        """
+        order, skipped = self.model_stats.ranked()
+        backups = [
+            name for name in order
+            if name != primary and name in config.FALLBACK_MODELS and self._model_configured(name)
+            and (text_tokens is None or self._model_fits(name, text_tokens, prompt_tokens))
+        ]
+        if primary in skipped and backups:
+            print(f"Skipping {primary}: circuit open after repeated failures")
+            return backups
+        return [primary] + backups
+    
+    def _model_fits(self, model, text_tokens, prompt_tokens):
+        """
+        True if text_tokens fits the model's chunk budget (so the output isn't truncated)
+        and the request's admission cost (~2x prompt tokens) fits its TPM quota.
+        """
+        model_info = config.AVAILABLE_MODELS.get(model, {})
+        if text_tokens > model_info.get('chunk_tokens', DEFAULT_CHUNK_TOKENS):
+            return False
+        tpm = model_info.get('tpm')
+        return not tpm or (prompt_tokens or text_tokens) * 2 <= tpm
+    
+    def _model_configured(self, model):
+        """False for Groq models when no Groq API key is set."""
+        provider = config.AVAILABLE_MODELS.get(model, {}).get('provider', 'google')
+        return provider != 'groq' or bool(config.GROQ_API_KEY)
+    
+    def _call_model_async(self, prompt, model, fields=None, admitted=False):
+        """
+        Run _call_model on its own thread and return a Future. A dedicated thread
+        (not a pool) means a hedge never queues behind other requests' calls.
+        """
+        future = Future()
+        
+        def run():
+            future.set_result(self._call_model(prompt, model, fields, admitted))
+        
+        threading.Thread(target=run, daemon=True).start()
+        return future
+    
+    def _call_model(self, prompt, model, fields=None, admitted=False):
+        """
+        Send one prompt to a specific model and record its latency and outcome.
+        Waits for rate-limit admission first unless the caller already did (admitted=True).
+        """
+        provider = config.AVAILABLE_MODELS.get(model, {}).get('provider', 'google')
+        if not admitted:
+            self.admit(model, prompt)
+        start = time.time()
+        try:
+            if fields:
+                result = self._generate_structured(prompt, model, fields)
+            elif provider == 'groq':
+                result = self._translate_with_groq(prompt, model)
+            else:
+                result = self._translate_with_gemini(prompt, model)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        
+        result.setdefault('model', model)
+        self.model_stats.record(model, bool(result.get('success')), time.time() - start)
+        return result
+    
+    def admit(self, model, prompt):
+        """
+        Wait for the model's RPM/TPM quota before sending prompt. The response is
+        assumed to be about as long as the prompt (translation), so ~2x prompt tokens.
+        """
+        waited = self.limiter.admit(model, estimate_tokens(prompt) * 2)
+        if waited > 1:
+            print(f"Rate limit: waited {waited:.1f}s for {model}")
+        return waited
+    
+    def rate_limit_status(self):
+        """Return per-model queue depth and admission wait times."""
+        return self.limiter.status()
+    
+    def model_health(self):
+        """Return live latency/success stats per AI model."""
+        return self.model_stats.snapshot()
+    
+    def _split_into_chunks(self, text, max_tokens, level=0):
+        """
+        Split text into chunks of at most ~max_tokens, breaking between paragraphs
+        (or caption lines when there are no blank lines). A unit that is still too
+        long is split further at lines, then sentences, then words.
+        """
+        text_tokens = estimate_tokens(text)
+        if text_tokens <= max_tokens:
+            return [text]
+        
+        if level == len(CHUNK_BOUNDARIES):
+            # No whitespace left to break at - cut evenly by characters
+            count = -(-text_tokens // max_tokens)
+            size = -(-len(text) // count)
+            return [text[i:i + size] for i in range(0, len(text), size)]
+        
+        boundary, joiner = CHUNK_BOUNDARIES[level]
+        units = [u.strip() for u in boundary.split(text) if u.strip()]
+        if len(units) < 2:
+            return self._split_into_chunks(text, max_tokens, level + 1)
+        
+        chunks = []
+        current = []
+        current_tokens = 0
+        for unit in units:
+            # +1 covers the joiner and the estimate's rounding (matters for short units)
+            unit_tokens = estimate_tokens(unit) + 1
+            if current and current_tokens + unit_tokens > max_tokens:
+                chunks.append(joiner.join(current))
+                current, current_tokens = [], 0
+            if unit_tokens > max_tokens:
+                chunks.extend(self._split_into_chunks(unit, max_tokens, level + 1))
+                continue
+            current.append(unit)
+            current_tokens += unit_tokens
+        
+        if current:
+            chunks.append(joiner.join(current))
+        return chunks
+    
+    def _translate_chunks(self, chunks, model, hedge=True):
+        """Translate chunks concurrently and stitch them back together in order."""
+        with ThreadPoolExecutor(max_workers=min(CHUNK_WORKERS, len(chunks))) as pool:
+            results = list(pool.map(
+                lambda chunk: self._translate_prompt(self.ENGLISH_PROMPT.format(text=chunk), model, hedge,
+                                                     text_tokens=estimate_tokens(chunk)),
+                chunks
+            ))
+        
+        failed = [r for r in results if not r.get('success')]
+        if failed:
+            return {
+                'success': False,
+                'error': f"{len(failed)} of {len(results)} chunks failed: {failed[0].get('error')}"
+            }
+        
+        result = dict(results[0])
+        result['translated_text'] = '\n\n'.join(r['translated_text'] for r in results)
+        result['chunks'] = len(results)
+        result['models'] = [r['model'] for r in results]
+        result['hedged'] = any(r.get('hedged') for r in results)
+        return result
+    
+    def _stream_prompt(self, prompt, model):
+        """Send one prompt to the model's provider, yielding raw text deltas."""
+        model_info = config.AVAILABLE_MODELS.get(model, {})
         provider = model_info.get('provider', 'google')
         
         if provider == 'groq':
-            return self._translate_with_groq(prompt)
+            if not self.groq_client:
+                raise RuntimeError('Groq API not configured. Add GROQ_API_KEY to .env')
+            stream = self.groq_client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_completion_tokens=4096,
+                top_p=1,
+                stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
         else:
-            return self._translate_with_gemini(prompt)
+            stream = self.gemini_client.models.generate_content_stream(
+                model=model,
+                contents=prompt
+            )
+            for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
     
-    def _translate_with_gemini(self, prompt):
-        """Translate using Google Gemini/Gemma API."""
-        global _current_model
+    def _normalize_stream(self, deltas):
+        """
+        Incremental strip() + _normalize_line_breaks() over streamed deltas.
+        Trailing whitespace is held back until the next delta so newline runs
+        split across deltas are normalized as a whole.
+        """
+        pending = ''
+        started = False
+        for delta in deltas:
+            text = pending + delta
+            body = text.rstrip()
+            pending = text[len(body):]
+            if not started:
+                body = body.lstrip()
+                started = bool(body)
+            if body:
+                yield self._normalize_line_breaks(body)
+    
+    def _generate_structured(self, prompt, model, fields):
+        """
+        Request a JSON object with the given string fields using the provider's
+        structured-output mode, and validate it.
+        """
+        model_info = config.AVAILABLE_MODELS.get(model, {})
+        
+        if model_info.get('provider') == 'groq':
+            if not self.groq_client:
+                raise RuntimeError('Groq API not configured. Add GROQ_API_KEY to .env')
+            completion = self.groq_client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_completion_tokens=8192,
+                response_format={"type": "json_object"},
+                stream=False
+            )
+            response_text = completion.choices[0].message.content
+        else:
+            from google.genai import types
+            
+            # Gemma has no JSON mode on the Gemini API; the prompt alone asks for JSON
+            generation_config = None
+            if model_info.get('json_mode'):
+                generation_config = types.GenerateContentConfig(
+                    response_mime_type='application/json',
+                    response_schema={
+                        'type': 'OBJECT',
+                        'properties': {field: {'type': 'STRING'} for field in fields},
+                        'required': list(fields)
+                    }
+                )
+            response = self.gemini_client.models.generate_content(
+                model=model,
+                contents=prompt,
+                config=generation_config
+            )
+            response_text = response.text
+        
+        return {
+            'success': True,
+            'data': self._parse_structured(response_text, fields),
+            'model': model
+        }
+    
+    def _parse_structured(self, response_text, fields):
+        """
+        Parse and validate a JSON object with non-empty string fields. The object is
+        decoded from the first '{', so stray prose or markdown around it is ignored.
+        """
+        start = (response_text or '').find('{')
+        if start == -1:
+            raise ValueError('Failed to parse AI response: no JSON object')
+        try:
+            data, _ = json.JSONDecoder().raw_decode(response_text[start:])
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Failed to parse AI response: {e}')
         
+        validated = {}
+        for field in fields:
+            value = data.get(field) if isinstance(data, dict) else None
+            if isinstance(value, list):  # e.g. tags returned as an array
+                value = ', '.join(str(v) for v in value)
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError(f"AI response is missing '{field}'")
+            validated[field] = value.strip()
+        return validated
+    
+    def _translate_with_gemini(self, prompt, model):
+        """Translate using Google Gemini/Gemma API."""
         response = self.gemini_client.models.generate_content(
-            model=_current_model,
+            model=model,
             contents=prompt
         )
         translated_text = response.text.strip()
@@ -132,13 +862,11 @@ Provide ONLY the translated text as flowing paragraphs, nothing else."""
             'translated_text': translated_text,
             'target_lang': 'en',
             'method': 'ai',
-            'model': _current_model
+            'model': model
         }
     
-    def _translate_with_groq(self, prompt):
+    def _translate_with_groq(self, prompt, model):
         """Translate using Groq API (GPT models)."""
-        global _current_model
-        
         if not self.groq_client:
             return {
                 'success': False,
@@ -147,7 +875,7 @@ Provide ONLY the translated text as flowing paragraphs, nothing else."""
         
         # Non-streaming call for simpler handling
         completion = self.groq_client.chat.completions.create(
-            model=_current_model,
+            model=model,
             messages=[
                 {"role": "user", "content": prompt}
             ],
@@ -167,7 +895,7 @@ Provide ONLY the translated text as flowing paragraphs, nothing else."""
             'translated_text': translated_text,
             'target_lang': 'en',
             'method': 'ai',
-            'model': _current_model
+            'model': model
         }
     
     def _normalize_line_breaks(self, text):
@@ -179,17 +907,87 @@ Provide ONLY the translated text as flowing paragraphs, nothing else."""
         return text
     
     def _translate_with_google(self, text, target_lang):
-        """Translate from English to other languages using Google Translate."""
-        translator = GoogleTranslator(source='en', target=target_lang)
-        translated_text = translator.translate(text)
+        """
+        Translate from English to other languages using Google Translate.
+        Works sentence by sentence: cached sentences are reused, the rest are sent
+        in a few batched requests, and the document is reassembled in order.
+        """
+        pieces = SENTENCE_BOUNDARY.split(text)
+        sentences = pieces[0::2]  # separators sit at the odd indices
+        
+        keys = {}
+        translations = {}
+        for sentence in sentences:
+            stripped = sentence.strip()
+            if stripped and stripped not in keys:
+                keys[stripped] = self._sentence_key(stripped, target_lang)
+                cached = self.sentence_cache.get(keys[stripped])
+                if cached is not None:
+                    translations[stripped] = cached
+        
+        cached_count = len(translations)
+        missing = [sentence for sentence in keys if sentence not in translations]
+        requests = 0
+        for batch in self._sentence_batches(missing):
+            requests += 1
+            for sentence, translated in zip(batch, self._translate_sentence_batch(batch, target_lang)):
+                if not translated:
+                    # Nothing to translate (e.g. emoji-only) - keep the source, don't cache
+                    translations[sentence] = sentence
+                    continue
+                translations[sentence] = translated
+                self.sentence_cache.set(keys[sentence], translated)
+        
+        for i in range(0, len(pieces), 2):
+            stripped = pieces[i].strip()
+            if stripped:
+                pieces[i] = pieces[i].replace(stripped, translations[stripped])
         
         return {
             'success': True,
-            'translated_text': translated_text,
+            'translated_text': ''.join(pieces),
             'target_lang': target_lang,
-            'method': 'google'
+            'method': 'google',
+            'sentences': {
+                'unique': len(keys),
+                'cached': cached_count,
+                'translated': len(missing),
+                'requests': requests
+            }
         }
     
+    def _sentence_key(self, sentence, target_lang):
+        """Sentence cache key: target language + hash of the whitespace-normalized sentence."""
+        normalized = ' '.join(sentence.split())
+        return f"{target_lang}|{hashlib.sha256(normalized.encode('utf-8')).hexdigest()}"
+    
+    def _sentence_batches(self, sentences):
+        """Group sentences into newline-joined requests under Google's size limit."""
+        batch, size = [], 0
+        for sentence in sentences:
+            if batch and size + len(sentence) + 1 > GOOGLE_BATCH_CHARS:
+                yield batch
+                batch, size = [], 0
+            batch.append(sentence)
+            size += len(sentence) + 1
+        if batch:
+            yield batch
+    
+    def _translate_sentence_batch(self, batch, target_lang):
+        """
+        Translate a batch as one newline-joined request. Google keeps one line per
+        input line; if it merges or splits lines, fall back to one request per sentence.
+        A fresh GoogleTranslator per batch: it keeps request state on the instance.
+        """
+        translator = GoogleTranslator(source='en', target=target_lang)
+        if len(batch) == 1:
+            return [translator.translate(batch[0])]
+        
+        lines = (translator.translate('\n'.join(batch)) or '').split('\n')
+        if len(lines) == len(batch):
+            return [line.strip() for line in lines]
+        return [translator.translate(sentence) for sentence in batch]
+    
     @classmethod
     def get_languages(cls):
         """Return available language options."""
@@ -2,30 +2,89 @@
 Voice Generator Module
 Uses Microsoft Edge TTS (edge-tts) for high-quality voiceover generation.
 Supports 322+ voices, auto-chunking for long texts, and progress tracking.
+The voice catalog is persisted to disk and indexed for server-side filtering.
+Synthesized chunks are cached on disk by content, so regenerating after a
+small edit only re-synthesizes the chunks that changed. Audio can be streamed
+to the browser while synthesis is still in progress.
+
+All edge-tts work runs on one long-lived background event loop (submit() /
+run_sync()), so Flask threads never create and tear down their own loops.
 """
 
 import edge_tts
 import asyncio
+import hashlib
+import json
 import os
 import re
-import tempfile
+import threading
 import time
+import uuid
 from mutagen.mp3 import MP3
 
 
 # ===== CONFIGURATION =====
 CHUNK_SIZE = 4500          # Characters per edge-tts request (~5000 limit)
+MAX_CONCURRENT_CHUNKS = 4  # Chunks synthesized in parallel per voiceover
+MIN_CHUNK_SIZE = 600       # Content-defined chunking: never cut before this many characters
+CUT_MODULUS = 8            # ...then cut after a sentence whose hash is 0 mod this (~1 in 8)
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'output', 'audio')
+TTS_CACHE_DIR = os.path.join(os.path.dirname(__file__), 'output', 'cache', 'tts')
+TTS_CACHE_MAX_BYTES = 500 * 1024 * 1024  # LRU eviction above this total size
+LIVE_STREAM_TTL = 600      # Seconds a finished live stream stays replayable
+MAX_CONCURRENT_SYNTHESES = 16  # edge-tts requests in flight across all voiceovers
+VOICE_CATALOG_PATH = os.path.join(os.path.dirname(__file__), 'output', 'cache', 'voices.json')
+VOICE_CATALOG_TTL = 7 * 24 * 3600  # Refresh the voice list in the background after this
 DEFAULT_VOICE = 'es-MX-DaliaNeural'  # Spanish female (natural-sounding)
 DEFAULT_RATE = '+0%'
 DEFAULT_PITCH = '+0Hz'
 
-# Ensure output directory exists
+# Ensure output directories exist
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+
+
+# ===== EVENT LOOP SERVICE =====
+_loop = None
+_loop_lock = threading.Lock()
+_synthesis_slots = None    # Global semaphore, created on the loop
+
+
+def _get_loop():
+    """Return the shared TTS event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='tts-loop', daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def submit(coro):
+    """Schedule a coroutine on the TTS loop from any thread; returns a concurrent.futures.Future."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+
+def run_sync(coro, timeout=None):
+    """Run a coroutine on the TTS loop and block the calling thread for its result."""
+    return submit(coro).result(timeout)
+
+
+def _get_synthesis_slots():
+    """Global cap on concurrent edge-tts requests (must be called on the TTS loop)."""
+    global _synthesis_slots
+    if _synthesis_slots is None:
+        _synthesis_slots = asyncio.Semaphore(MAX_CONCURRENT_SYNTHESES)
+    return _synthesis_slots
 
 
 # ===== VOICE CACHE =====
-_voices_cache = None
+_voices_cache = None       # {language: [voice_objects]}
+_voice_index = None        # Lookup tables built by _build_voice_index()
+_voices_fetched_at = 0.0
+_voices_lock = None        # asyncio.Lock, created on the loop
+_voices_refresh_task = None   # Strong reference so a running refresh isn't garbage-collected
 
 
 # Language code to human-readable name mapping
@@ -148,63 +207,219 @@ def _organize_voices(voices):
     return dict(sorted(organized.items()))
 
 
-async def _get_all_voices():
-    """Fetch all available voices from edge-tts (async)."""
-    global _voices_cache
-    if _voices_cache is not None:
-        return _voices_cache
+def _build_voice_index(organized):
+    """
+    Lookup tables over the organized catalog: voice ids in display order,
+    plus id lists by language, locale, gender and tier (keys lowercased).
+    """
+    index = {'order': [], 'by_id': {}, 'language': {}, 'locale': {}, 'gender': {}, 'tier': {}}
+    
+    for lang_name, voices in organized.items():
+        for voice in voices:
+            voice_id = voice['id']
+            index['order'].append(voice_id)
+            index['by_id'][voice_id] = dict(voice, language=lang_name)
+            index['language'].setdefault(lang_name.lower(), []).append(voice_id)
+            index['locale'].setdefault(voice['locale'].lower(), []).append(voice_id)
+            index['gender'].setdefault(voice['gender'].lower(), []).append(voice_id)
+            if voice['tier']:
+                index['tier'].setdefault(voice['tier'].lower(), []).append(voice_id)
     
+    return index
+
+
+def _set_voices(raw_voices, fetched_at):
+    """Install a raw edge-tts voice list as the current catalog."""
+    global _voices_cache, _voice_index, _voices_fetched_at
+    organized = _organize_voices(raw_voices)
+    _voice_index = _build_voice_index(organized)
+    _voices_cache = organized
+    _voices_fetched_at = fetched_at
+
+
+def _load_voice_catalog():
+    """Load the persisted raw voice list; False if missing or unreadable."""
+    try:
+        with open(VOICE_CATALOG_PATH, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        _set_voices(catalog['voices'], catalog['fetched_at'])
+        return True
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def _save_voice_catalog(raw_voices, fetched_at):
+    """Persist the raw voice list (atomically, so readers never see a partial file)."""
+    tmp_path = f"{VOICE_CATALOG_PATH}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'fetched_at': fetched_at, 'voices': raw_voices}, f, ensure_ascii=False)
+    os.replace(tmp_path, VOICE_CATALOG_PATH)
+
+
+async def _fetch_voices():
+    """Download the voice list from edge-tts and persist it."""
     voices = await edge_tts.list_voices()
-    _voices_cache = _organize_voices(voices)
+    fetched_at = time.time()
+    _set_voices(voices, fetched_at)
+    try:
+        await asyncio.to_thread(_save_voice_catalog, voices, fetched_at)
+    except OSError as e:
+        print(f"Warning: could not save voice catalog: {e}")
+
+
+async def _refresh_voices():
+    """Background refresh of a stale catalog; keeps serving the old one on failure."""
+    try:
+        await _fetch_voices()
+    except Exception as e:
+        print(f"Warning: voice catalog refresh failed: {e}")
+
+
+async def _get_all_voices():
+    """
+    Return the organized voice catalog (async, runs on the TTS loop).
+    Served from memory, then from the on-disk catalog; downloaded only when
+    neither exists. A catalog older than VOICE_CATALOG_TTL is still served
+    while a background refresh replaces it.
+    """
+    global _voices_lock, _voices_refresh_task
+    if _voices_cache is None:
+        # Concurrent first requests share one load/download
+        if _voices_lock is None:
+            _voices_lock = asyncio.Lock()
+        async with _voices_lock:
+            if _voices_cache is None and not await asyncio.to_thread(_load_voice_catalog):
+                await _fetch_voices()
+    
+    refreshing = _voices_refresh_task is not None and not _voices_refresh_task.done()
+    if time.time() - _voices_fetched_at > VOICE_CATALOG_TTL and not refreshing:
+        _voices_refresh_task = asyncio.get_running_loop().create_task(_refresh_voices())
+    
     return _voices_cache
 
 
 def get_voices_sync():
     """Synchronous wrapper to get all voices (for Flask routes)."""
-    return asyncio.run(_get_all_voices())
+    return run_sync(_get_all_voices())
 
 
-def get_voice_count():
-    """Get total voice and language count."""
-    voices = get_voices_sync()
+def get_voice_count(voices=None):
+    """Get total voice and language count (pass voices to avoid fetching them again)."""
+    if voices is None:
+        voices = get_voices_sync()
     total_voices = sum(len(v) for v in voices.values())
     total_languages = len(voices)
     return total_voices, total_languages
 
 
+def get_voice_languages():
+    """Languages with their voice counts, for pickers that load voices per language."""
+    voices = get_voices_sync()
+    return [{'name': lang, 'count': len(items)} for lang, items in voices.items()]
+
+
+def query_voices(language=None, locale=None, gender=None, tier=None, recommended=None,
+                 search=None, page=1, per_page=None):
+    """
+    Filter the catalog using the indexes.
+    - language: name ('Spanish') or code ('es'); locale: 'es-MX'
+    - gender: 'Female' / 'Male'; tier: 'ultra' / 'good'; recommended: True/False
+    - search: substring of the voice id or display name
+    Returns matching voices grouped by language (same shape as get_voices_sync()),
+    paginated when per_page is given.
+    """
+    get_voices_sync()
+    index = _voice_index
+    
+    candidates = None
+    filters = [
+        ('language', LANG_NAMES.get(language, language) if language else None),
+        ('locale', locale),
+        ('gender', gender),
+        ('tier', tier)
+    ]
+    for field, value in filters:
+        if value:
+            ids = set(index[field].get(value.lower(), []))
+            candidates = ids if candidates is None else candidates & ids
+    
+    matches = [voice_id for voice_id in index['order'] if candidates is None or voice_id in candidates]
+    if recommended is not None:
+        matches = [v for v in matches if index['by_id'][v]['recommended'] == recommended]
+    if search:
+        needle = search.lower()
+        matches = [v for v in matches
+                   if needle in v.lower() or needle in index['by_id'][v]['display'].lower()]
+    
+    total = len(matches)
+    page = max(1, page)
+    per_page = max(1, per_page) if per_page is not None else None
+    if per_page:
+        matches = matches[(page - 1) * per_page:page * per_page]
+    
+    grouped = {}
+    for voice_id in matches:
+        voice = dict(index['by_id'][voice_id])
+        grouped.setdefault(voice.pop('language'), []).append(voice)
+    
+    return {
+        'voices': grouped,
+        'total': total,
+        'page': page,
+        'per_page': per_page or total,
+        'pages': -(-total // per_page) if per_page else 1,
+        'recommended': {v: RECOMMENDED_VOICES[v] for v in matches if v in RECOMMENDED_VOICES}
+    }
+
+
 # ===== TEXT CHUNKING =====
 
+def _is_cut_point(sentence):
+    """Deterministic, content-only decision to end a chunk after this sentence."""
+    digest = hashlib.md5(sentence.encode('utf-8')).digest()
+    return digest[0] % CUT_MODULUS == 0
+
+
 def _split_into_chunks(text, chunk_size=CHUNK_SIZE):
-    """Split text into chunks at sentence boundaries."""
-    if len(text) <= chunk_size:
-        return [text]
-    
+    """
+    Split text into chunks at sentence boundaries.
+
+    Boundaries are content-defined: after MIN_CHUNK_SIZE characters a chunk ends
+    at the first sentence whose hash selects it (or when chunk_size would be
+    exceeded). Because the choice depends only on the sentences themselves,
+    editing one sentence changes only the chunk containing it and the chunk
+    boundaries re-align right after, so the TTS cache still hits for the rest.
+    """
     chunks = []
     current = ''
     
     # Split by sentences
-    sentences = re.split(r'(?<=[.!?])\s+', text)
+    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
     
     for sentence in sentences:
-        if len(current) + len(sentence) + 1 <= chunk_size:
-            current = (current + ' ' + sentence).strip()
-        else:
+        if not sentence:
+            continue
+        
+        if len(current) + len(sentence) + 1 > chunk_size:
             if current:
                 chunks.append(current)
+                current = ''
             # Handle single sentences longer than chunk_size
             if len(sentence) > chunk_size:
                 # Split at word boundaries
-                words = sentence.split()
-                current = ''
-                for word in words:
+                for word in sentence.split():
                     if len(current) + len(word) + 1 <= chunk_size:
                         current = (current + ' ' + word).strip()
                     else:
                         if current:
                             chunks.append(current)
                         current = word
-            else:
-                current = sentence
+                continue
+        
+        current = (current + ' ' + sentence).strip()
+        if len(current) >= MIN_CHUNK_SIZE and _is_cut_point(sentence):
+            chunks.append(current)
+            current = ''
     
     if current:
         chunks.append(current)
@@ -212,6 +427,87 @@ def _split_into_chunks(text, chunk_size=CHUNK_SIZE):
     return chunks
 
 
+# ===== TTS CHUNK CACHE =====
+
+_tts_cache_lock = threading.Lock()
+_tts_cache_stats = {'hits': 0, 'misses': 0}
+
+
+def _tts_cache_path(text, voice, rate, pitch):
+    """Cache file for one synthesized chunk, addressed by (text, voice, rate, pitch)."""
+    key = hashlib.sha256(f"{voice}|{rate}|{pitch}|{text}".encode('utf-8')).hexdigest()
+    return os.path.join(TTS_CACHE_DIR, f"{key}.mp3")
+
+
+def _tts_cache_lookup(path):
+    """True if the chunk is cached; touches it so LRU eviction keeps it."""
+    with _tts_cache_lock:
+        if os.path.exists(path):
+            os.utime(path, None)
+            _tts_cache_stats['hits'] += 1
+            return True
+        _tts_cache_stats['misses'] += 1
+        return False
+
+
+def _read_tts_chunk(path):
+    """Read a cached chunk's audio."""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _write_tts_chunk(path, data):
+    """Store a chunk's audio under a temp name first so readers never see a partial file."""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _evict_tts_cache():
+    """Delete least-recently-used chunk files until the cache fits TTS_CACHE_MAX_BYTES."""
+    with _tts_cache_lock:
+        entries = []
+        for name in os.listdir(TTS_CACHE_DIR):
+            path = os.path.join(TTS_CACHE_DIR, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= TTS_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+def get_tts_cache_stats():
+    """Return TTS chunk cache size and hit/miss counters."""
+    with _tts_cache_lock:
+        files = [os.path.join(TTS_CACHE_DIR, name) for name in os.listdir(TTS_CACHE_DIR)
+                 if name.endswith('.mp3')]
+        hits, misses = _tts_cache_stats['hits'], _tts_cache_stats['misses']
+    lookups = hits + misses
+    return {
+        'entries': len(files),
+        'bytes': sum(os.path.getsize(path) for path in files if os.path.exists(path)),
+        'max_bytes': TTS_CACHE_MAX_BYTES,
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 3) if lookups else 0.0
+    }
+
+
 # ===== PROGRESS TRACKING =====
 
 # Global progress state for background tasks
@@ -239,15 +535,37 @@ def _update_progress(task_id, status, progress, message='', **kwargs):
 
 # ===== VOICEOVER GENERATION =====
 
-async def _generate_chunk(text, voice, rate, pitch, output_path):
-    """Generate a single audio chunk."""
+async def _generate_cached_chunk(text, voice, rate, pitch, on_audio):
+    """
+    Pass a chunk's audio to the async callback on_audio(bytes), streaming it from
+    edge-tts on a cache miss (frames arrive as they are synthesized) and from disk
+    on a hit. Returns True if the chunk was cached. File access runs in worker
+    threads so the shared TTS loop never blocks on disk.
+    """
+    path = _tts_cache_path(text, voice, rate, pitch)
+    if await asyncio.to_thread(_tts_cache_lookup, path):
+        await on_audio(await asyncio.to_thread(_read_tts_chunk, path))
+        return True
+    
+    frames = []
     communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch)
-    await communicate.save(output_path)
+    async for message in communicate.stream():
+        if message['type'] == 'audio':
+            frames.append(message['data'])
+            await on_audio(message['data'])
+    await asyncio.to_thread(_write_tts_chunk, path, b''.join(frames))
+    return False
 
 
 async def _generate_voiceover_async(text, voice=DEFAULT_VOICE, rate=DEFAULT_RATE, 
-                                      pitch=DEFAULT_PITCH, output_name=None, task_id=None):
-    """Generate voiceover audio (async implementation)."""
+                                      pitch=DEFAULT_PITCH, output_name=None, task_id=None,
+                                      on_audio=None):
+    """
+    Generate voiceover audio (async implementation).
+    Chunks are synthesized concurrently, but their audio is written to the output
+    file in script order as soon as it is available — and passed to on_audio(bytes)
+    when given, for live streaming.
+    """
     if not output_name:
         output_name = f"voiceover_{int(time.time())}"
     
@@ -261,43 +579,59 @@ async def _generate_voiceover_async(text, voice=DEFAULT_VOICE, rate=DEFAULT_RATE
         _update_progress(task_id, 'generating', 0, 
                         f'Starting generation ({total_chunks} chunk{"s" if total_chunks > 1 else ""})')
     
-    if total_chunks == 1:
-        # Single chunk — direct generation
+    # Each chunk feeds its own queue; None marks the end, an exception a failure
+    queues = [asyncio.Queue() for _ in chunks]
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+    completed = 0
+    cached_chunks = 0
+    
+    async def synthesize(i):
+        nonlocal completed, cached_chunks
+        try:
+            async with semaphore, _get_synthesis_slots():
+                cached = await _generate_cached_chunk(chunks[i], voice, rate, pitch, queues[i].put)
+        except Exception as e:
+            await queues[i].put(e)
+            return
+        completed += 1
+        cached_chunks += cached
         if task_id:
-            _update_progress(task_id, 'generating', 50, 'Generating audio...')
-        
-        await _generate_chunk(chunks[0], voice, rate, pitch, output_path)
-    else:
-        # Multiple chunks — generate and merge
-        chunk_files = []
-        
-        with tempfile.TemporaryDirectory() as tmpdir:
-            for i, chunk in enumerate(chunks):
-                chunk_path = os.path.join(tmpdir, f"chunk_{i}.mp3")
-                
-                if task_id:
-                    progress = int((i / total_chunks) * 90)
-                    _update_progress(task_id, 'generating', progress,
-                                   f'Generating chunk {i+1} of {total_chunks}')
-                
-                await _generate_chunk(chunk, voice, rate, pitch, chunk_path)
-                chunk_files.append(chunk_path)
-            
-            if task_id:
-                _update_progress(task_id, 'merging', 90, 'Merging audio chunks...')
-            
-            # Merge all chunks using binary concatenation (MP3 is frame-based)
-            with open(output_path, 'wb') as outfile:
-                for chunk_file in chunk_files:
-                    with open(chunk_file, 'rb') as infile:
-                        outfile.write(infile.read())
-    
-    # Get duration
+            progress = int((completed / total_chunks) * 90)
+            _update_progress(task_id, 'generating', progress,
+                           f'Generated chunk {completed} of {total_chunks}',
+                           chunks_done=completed, chunks_total=total_chunks,
+                           chunks_cached=cached_chunks)
+        await queues[i].put(None)
+    
+    tasks = [asyncio.create_task(synthesize(i)) for i in range(total_chunks)]
     try:
-        audio = MP3(output_path)
-        duration = audio.info.length
-    except Exception:
-        duration = 0
+        # MP3 is frame-based, so chunks concatenate into one valid file.
+        # Frames stream out immediately; disk writes happen once per chunk off the loop.
+        outfile = await asyncio.to_thread(open, output_path, 'wb')
+        try:
+            for queue in queues:
+                chunk_audio = []
+                while True:
+                    data = await queue.get()
+                    if data is None:
+                        break
+                    if isinstance(data, Exception):
+                        raise data
+                    chunk_audio.append(data)
+                    if on_audio:
+                        on_audio(data)
+                await asyncio.to_thread(outfile.write, b''.join(chunk_audio))
+        finally:
+            await asyncio.to_thread(outfile.close)
+    except Exception as e:
+        for task in tasks:
+            task.cancel()
+        if task_id:
+            _update_progress(task_id, 'error', 0, f'Voiceover failed: {e}')
+        raise
+    
+    await asyncio.to_thread(_evict_tts_cache)
+    duration = await asyncio.to_thread(_get_duration, output_path)
     
     if task_id:
         _update_progress(task_id, 'done', 100, 'Voiceover generated!',
@@ -310,14 +644,31 @@ async def _generate_voiceover_async(text, voice=DEFAULT_VOICE, rate=DEFAULT_RATE
         'output_path': output_path,
         'output_name': f"{output_name}.mp3",
         'duration': duration,
-        'chunks': total_chunks
+        'chunks': total_chunks,
+        'cached_chunks': cached_chunks
     }
 
 
+def _get_duration(path):
+    """Length of an MP3 file in seconds (0 if it can't be read)."""
+    try:
+        return MP3(path).info.length
+    except Exception:
+        return 0
+
+
 def generate_voiceover(text, voice=DEFAULT_VOICE, rate=DEFAULT_RATE,
                        pitch=DEFAULT_PITCH, output_name=None, task_id=None):
     """Generate voiceover audio (synchronous wrapper)."""
-    return asyncio.run(
+    return run_sync(
+        _generate_voiceover_async(text, voice, rate, pitch, output_name, task_id)
+    )
+
+
+def start_voiceover(text, voice=DEFAULT_VOICE, rate=DEFAULT_RATE,
+                    pitch=DEFAULT_PITCH, output_name=None, task_id=None):
+    """Start voiceover generation on the TTS loop without blocking; returns a Future."""
+    return submit(
         _generate_voiceover_async(text, voice, rate, pitch, output_name, task_id)
     )
 
@@ -329,7 +680,8 @@ async def _generate_preview_async(text, voice=DEFAULT_VOICE, rate=DEFAULT_RATE,
     preview_path = os.path.join(OUTPUT_DIR, f"preview_{int(time.time())}.mp3")
     
     communicate = edge_tts.Communicate(preview_text, voice, rate=rate, pitch=pitch)
-    await communicate.save(preview_path)
+    async with _get_synthesis_slots():
+        await communicate.save(preview_path)
     
     return {
         'success': True,
@@ -339,4 +691,84 @@ async def _generate_preview_async(text, voice=DEFAULT_VOICE, rate=DEFAULT_RATE,
 
 def generate_preview(text, voice=DEFAULT_VOICE, rate=DEFAULT_RATE, pitch=DEFAULT_PITCH):
     """Generate a short preview clip (synchronous)."""
-    return asyncio.run(_generate_preview_async(text, voice, rate, pitch))
+    return run_sync(_generate_preview_async(text, voice, rate, pitch))
+
+
+# ===== LIVE STREAMING =====
+
+class LiveVoiceover:
+    """
+    Audio frames of an in-progress voiceover. Synthesis appends frames;
+    any number of HTTP responses can read them from the start while more arrive.
+    """
+
+    def __init__(self):
+        self.frames = []
+        self.done = False
+        self.error = None
+        self.finished_at = None
+        self._condition = threading.Condition()
+
+    def append(self, data):
+        with self._condition:
+            self.frames.append(data)
+            self._condition.notify_all()
+
+    def finish(self, error=None):
+        with self._condition:
+            self.done = True
+            self.error = error
+            self.finished_at = time.time()
+            self._condition.notify_all()
+
+    def iter_audio(self):
+        """Yield audio bytes from the beginning, blocking for new frames until synthesis ends."""
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self.frames) and not self.done:
+                    self._condition.wait(timeout=30)
+                frames = self.frames[index:]
+                done = self.done
+            index += len(frames)
+            if frames:
+                yield b''.join(frames)
+            elif done:
+                return
+
+
+_live_streams = {}
+_live_lock = threading.Lock()
+
+
+def start_live_voiceover(text, voice=DEFAULT_VOICE, rate=DEFAULT_RATE, pitch=DEFAULT_PITCH,
+                         output_name=None):
+    """
+    Start generating a voiceover in the background and return its id. The audio can be
+    streamed with get_live_voiceover(id).iter_audio() while it is being synthesized;
+    progress (and the final file name) is reported under the same id via get_progress().
+    """
+    stream_id = str(uuid.uuid4())
+    live = LiveVoiceover()
+    
+    with _live_lock:
+        # Forget finished streams nobody can still be listening to
+        now = time.time()
+        for old_id in [k for k, v in _live_streams.items()
+                       if v.finished_at and now - v.finished_at > LIVE_STREAM_TTL]:
+            del _live_streams[old_id]
+        _live_streams[stream_id] = live
+    
+    def finished(future):
+        error = future.exception()
+        live.finish(str(error) if error else None)
+    
+    submit(_generate_voiceover_async(text, voice, rate, pitch, output_name,
+                                     task_id=stream_id, on_audio=live.append)).add_done_callback(finished)
+    return stream_id
+
+
+def get_live_voiceover(stream_id):
+    """Return the LiveVoiceover for an id, or None."""
+    with _live_lock:
+        return _live_streams.get(stream_id)